@@ -0,0 +1,153 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Dict, Union
+
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Signature, IHDR, one IDAT and IEND chunks
+MIN_ASSET_BYTES = 67
+
+# Lock files of AssetLock, kept out of the asset directories
+LOCK_DIR = os.path.join(tempfile.gettempdir(), "enka-card-locks")
+
+
+class AssetDownloadError(Exception):
+    pass
+
+
+class InvalidAssetError(AssetDownloadError):
+    pass
+
+
+def validate_asset(content: bytes) -> None:
+    """Raise InvalidAssetError unless `content` is a complete PNG."""
+
+    if len(content) < MIN_ASSET_BYTES or not content.startswith(PNG_SIGNATURE):
+        raise InvalidAssetError("Downloaded asset is not a PNG image.")
+
+    try:
+        # Walks every chunk and checks CRCs without decoding pixels
+        Image.open(io.BytesIO(content)).verify()
+    except Exception as e:
+        raise InvalidAssetError("Downloaded asset is truncated or corrupt.") from e
+
+
+def atomic_write(
+    path: str, data: Union[bytes, Callable[[BinaryIO], None]], fsync: bool = False
+) -> None:
+    """Write `data` to `path` atomically: it goes to a temporary file
+    in the same directory which is then renamed over `path`, so
+    readers never see a partial file. The temporary file is removed
+    if writing fails.
+
+    `data` is either the bytes to write or a function writing them
+    to the open file. `fsync` flushes them to disk before the rename.
+    """
+
+    directory, name = os.path.split(path)
+    directory = directory or "."
+    os.makedirs(directory, exist_ok=True)
+
+    # Unique per writer, several may race for the same path
+    tmp_path = os.path.join(
+        directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(tmp_path, "wb") as f:
+            if callable(data):
+                data(f)
+            else:
+                f.write(data)
+
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_asset(path: str, content: bytes) -> None:
+    """Validate `content` and write it to `path` atomically."""
+
+    validate_asset(content)
+    atomic_write(path, content, fsync=True)
+
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class AssetLock:
+    """Exclusive lock on an asset path, held across threads of this
+    process and across processes (through a lock file), so only one
+    worker downloads a given asset at a time.
+
+    Lock files live in LOCK_DIR, named after a hash of the asset's
+    absolute path, and are left in place, since removing them would
+    race with new waiters.
+    """
+
+    def __init__(self, path: str, lock_dir: str = LOCK_DIR) -> None:
+        digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        self.lock_path = os.path.join(lock_dir, f"{digest}.lock")
+
+        with _thread_locks_guard:
+            self._thread_lock = _thread_locks.setdefault(
+                self.lock_path, threading.Lock()
+            )
+
+        self._file = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        try:
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+            self._file = open(self.lock_path, "a+b")
+
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+        finally:
+            self._file = None
+            self._thread_lock.release()
+
+    def __enter__(self) -> "AssetLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
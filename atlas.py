@@ -0,0 +1,151 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+from asset_io import atomic_write
+from pack import source_stamp
+from utils import brighten, get_stat_filename, open_image, scale_image
+
+ATLAS_PATH = "attributes/Assets/stat_icon_atlas.png"
+ATLAS_INDEX_PATH = "attributes/Assets/stat_icon_atlas.json"
+ATLAS_WIDTH = 512
+UI_DIR = "attributes/UI"
+
+# Every stat icon on the card is drawn 30px tall at double brightness
+STAT_ICON_HEIGHT = 30
+STAT_ICON_BRIGHTNESS = 2
+
+Region = Tuple[int, int, int, int]
+
+
+def is_stat_icon(name: str) -> bool:
+    return not (
+        name.endswith("_STAR")
+        or name.endswith("_WEAPON_LIGHT")
+        or name in ("LOCKED", "COMPANIONSHIP")
+    )
+
+
+def stat_icon_paths(ui_dir: str = UI_DIR) -> List[str]:
+    paths = []
+    for file in sorted(os.listdir(ui_dir)):
+        name, ext = os.path.splitext(file)
+        if ext.lower() == ".png" and is_stat_icon(name):
+            paths.append(f"{ui_dir}/{file}")
+
+    return paths
+
+
+def source_stamps(ui_dir: str = UI_DIR) -> Dict[str, List[int]]:
+    """(size, mtime_ns) of every stat icon the atlas is built from."""
+    return {path: list(source_stamp(path)) for path in stat_icon_paths(ui_dir)}
+
+
+def build_stat_icon_atlas(
+    ui_dir: str = UI_DIR, width: int = ATLAS_WIDTH
+) -> Tuple[Image.Image, Dict[str, Region]]:
+    """Render every stat icon in `ui_dir` the way the card draws it
+    and pack the results into rows of a single image. Returns the
+    atlas and a {icon name: (x, y, width, height)} lookup table."""
+
+    icons = {}
+    for path in stat_icon_paths(ui_dir):
+        name = os.path.splitext(os.path.basename(path))[0]
+        icon = scale_image(open_image(path), fixed_height=STAT_ICON_HEIGHT)
+        icons[name] = brighten(icon, STAT_ICON_BRIGHTNESS)
+
+    regions = {}
+    x = y = 0
+    for name, icon in icons.items():
+        if x + icon.width > width:
+            x, y = 0, y + STAT_ICON_HEIGHT
+
+        regions[name] = (x, y, icon.width, icon.height)
+        x += icon.width
+
+    atlas = Image.new("RGBA", (width, y + STAT_ICON_HEIGHT), (0, 0, 0, 0))
+    for name, icon in icons.items():
+        atlas.paste(icon, regions[name][:2])
+
+    return atlas, regions
+
+
+def save_stat_icon_atlas(
+    path: str = ATLAS_PATH, index_path: str = ATLAS_INDEX_PATH
+) -> Dict[str, Region]:
+    atlas, regions = build_stat_icon_atlas()
+    index = {
+        "height": STAT_ICON_HEIGHT,
+        "brightness": STAT_ICON_BRIGHTNESS,
+        "sources": source_stamps(),
+        "regions": regions,
+    }
+
+    atomic_write(path, lambda f: atlas.save(f, format="png"))
+    atomic_write(index_path, json.dumps(index, indent=2).encode())
+
+    return regions
+
+
+class StatIconAtlas:
+    """Ready-to-paste stat icons cut from a packed atlas,
+    looked up by FIGHT_PROP id."""
+
+    def __init__(self, atlas: Image.Image, regions: Dict[str, Region]) -> None:
+        self.atlas = atlas
+        self.regions = regions
+        self._icons = {
+            name: atlas.crop((x, y, x + w, y + h))
+            for name, (x, y, w, h) in regions.items()
+        }
+        self._lookup: Dict[str, Image.Image] = {}
+
+    @classmethod
+    def load(
+        cls, path: str = ATLAS_PATH, index_path: str = ATLAS_INDEX_PATH
+    ) -> "StatIconAtlas":
+        """Load the prebuilt atlas, building it in memory instead
+        if it is missing, was built with other icon settings or any
+        icon in attributes/UI was added, removed or edited since."""
+
+        if os.path.exists(path) and os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+
+            if (
+                index.get("height") == STAT_ICON_HEIGHT
+                and index.get("brightness") == STAT_ICON_BRIGHTNESS
+                and index.get("sources") == source_stamps()
+            ):
+                atlas = Image.open(path).convert("RGBA")
+                regions = {k: tuple(v) for k, v in index["regions"].items()}
+                return cls(atlas, regions)
+
+        return cls(*build_stat_icon_atlas())
+
+    def get(self, prop_id: str) -> Image.Image:
+        icon = self._lookup.get(prop_id)
+        if icon is None:
+            icon = self._icons[get_stat_filename(prop_id)]
+            self._lookup[prop_id] = icon
+        return icon
+
+
+@lru_cache(maxsize=None)
+def get_stat_icon_atlas() -> StatIconAtlas:
+    """Process-wide stat icon atlas, loaded on first use."""
+    return StatIconAtlas.load()
+
+
+def get_stat_icon(prop_id: str) -> Image.Image:
+    """Brightened 30px icon for a FIGHT_PROP id, shared
+    between callers so copy it before drawing onto it."""
+    return get_stat_icon_atlas().get(prop_id)
+
+
+if __name__ == "__main__":
+    regions = save_stat_icon_atlas()
+    print(f"Packed {len(regions)} stat icons into {ATLAS_PATH}")
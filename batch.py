@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor, as_completed)
+from typing import Iterable, Iterator, List, Literal, Optional
+
+from enkanetwork import EnkaNetworkAPI, EnkaNetworkResponse, Language
+from pydantic import BaseModel
+
+from card import CardData
+from encoder import (DEFAULT_COMPRESS_LEVEL, DEFAULT_QUALITY, FILE_EXTENSIONS,
+                     PNG_STRATEGIES, ImageFormat, save_image)
+from fetcher import AssetFetcher
+from fonts import font_registry
+from generator import encode_card, preload_assets
+
+
+class CardResult(BaseModel):
+    uid: int
+    character_id: int
+    character_name: str
+    content: Optional[bytes] = None
+    error: Optional[str] = None
+    # Render and encode time inside the worker
+    seconds: float
+
+
+class BatchStats(BaseModel):
+    cards: int = 0
+    failed: int = 0
+    # Sum of the per-card render times
+    render_seconds: float = 0.0
+    # Wall clock time of the whole batch
+    total_seconds: float = 0.0
+
+    @property
+    def cards_per_second(self) -> float:
+        return self.cards / self.total_seconds if self.total_seconds else 0.0
+
+    @property
+    def seconds_per_card(self) -> float:
+        return self.render_seconds / self.cards if self.cards else 0.0
+
+
+def warm_worker() -> None:
+    """Load fonts and static assets once per worker, so no card
+    pays for them."""
+
+    font_registry.warm()
+    preload_assets()
+
+
+def _render(
+    card: CardData,
+    locale: Language,
+    format: ImageFormat,
+    compress_level: int,
+    quality: int,
+    encode_options: dict,
+) -> CardResult:
+    start = time.perf_counter()
+
+    content, error = None, None
+    try:
+        content = encode_card(
+            card, locale, format, compress_level, quality, **encode_options
+        )
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return CardResult(
+        uid=card.player.uid,
+        character_id=card.character_id,
+        character_name=card.name,
+        content=content,
+        error=error,
+        seconds=time.perf_counter() - start,
+    )
+
+
+class BatchRenderer:
+    """Renders every character of one or more profiles across a
+    thread or process pool.
+
+    Pillow releases the GIL for most of the compositing and encoding
+    work, so threads share the asset caches and scale well; processes
+    sidestep the GIL entirely at the cost of warming every worker.
+    Each worker is warmed when it starts, and cards are handed to it
+    as CardData, extracted once here, rather than pickling the models.
+
+    Usage:
+        with BatchRenderer(workers=4) as renderer:
+            for result in renderer.render(data):
+                ...
+            print(renderer.stats)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: Literal["thread", "process"] = "thread",
+        locale: Language = Language.EN,
+        format: ImageFormat = "png",
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        quality: int = DEFAULT_QUALITY,
+        **encode_options,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_type = executor
+        self.locale = locale
+        self.format = format
+        self.compress_level = compress_level
+        self.quality = quality
+        self.encode_options = encode_options
+        self.stats = BatchStats()
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> "BatchRenderer":
+        if self.executor_type == "process":
+            self._executor = ProcessPoolExecutor(self.workers, initializer=warm_worker)
+        else:
+            # Threads share this process' caches, warm them once
+            warm_worker()
+            self._executor = ThreadPoolExecutor(self.workers)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+
+    def render(self, *profiles: EnkaNetworkResponse) -> Iterator[CardResult]:
+        """Render every character of `profiles`, yielding each
+        card as soon as it finishes."""
+
+        start = time.perf_counter()
+        futures = [
+            self._executor.submit(
+                _render,
+                CardData.from_api(data, character),
+                self.locale,
+                self.format,
+                self.compress_level,
+                self.quality,
+                self.encode_options,
+            )
+            for data in profiles
+            for character in data.characters or []
+        ]
+
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                self.stats.cards += 1
+                self.stats.failed += result.error is not None
+                self.stats.render_seconds += result.seconds
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+            self.stats.total_seconds += time.perf_counter() - start
+
+    def render_uids(self, uids: Iterable[int]) -> Iterator[CardResult]:
+        """Fetch the profiles of `uids` and render all of their characters."""
+
+        profiles = asyncio.run(fetch_profiles(uids, self.locale))
+        return self.render(*profiles)
+
+
+async def fetch_profiles(
+    uids: Iterable[int], locale: Language = Language.EN
+) -> List[EnkaNetworkResponse]:
+    """Fetch profiles and download every asset their cards need."""
+
+    async with EnkaNetworkAPI(lang=locale) as client, AssetFetcher() as fetcher:
+        profiles = await asyncio.gather(*(client.fetch_user(uid) for uid in uids))
+        await fetcher.prefetch(
+            character for data in profiles for character in data.characters or []
+        )
+
+    return list(profiles)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Render the cards of every character of the given profiles."
+    )
+    parser.add_argument("uids", type=int, nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--format", choices=tuple(FILE_EXTENSIONS), default="png")
+    parser.add_argument("--strategy", choices=tuple(PNG_STRATEGIES), default="default")
+    parser.add_argument("--colors", type=int, default=None, help="palette size")
+    parser.add_argument("--rgb", action="store_true", help="drop the alpha channel")
+    parser.add_argument("--output", default="output")
+    args = parser.parse_args()
+
+    with BatchRenderer(
+        args.workers,
+        args.executor,
+        format=args.format,
+        strategy=args.strategy,
+        colors=args.colors,
+        rgb=args.rgb,
+    ) as renderer:
+        for result in renderer.render_uids(args.uids):
+            if result.error:
+                print(f"[{result.uid}] {result.character_name} failed: {result.error}")
+                continue
+
+            filename = (
+                f"{result.uid}_{result.character_name}.{FILE_EXTENSIONS[args.format]}"
+            )
+            save_image(result.content, os.path.join(args.output, filename))
+            print(
+                f"[{result.uid}] {result.character_name} "
+                f"rendered in {result.seconds * 1000:.0f}ms"
+            )
+
+    stats = renderer.stats
+    print(
+        f"{stats.cards} cards ({stats.failed} failed) in {stats.total_seconds:.2f}s: "
+        f"{stats.cards_per_second:.2f} cards/s, "
+        f"{stats.seconds_per_card * 1000:.0f}ms per card"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Encode time versus size for every output mode, on a fixture card.
+
+    python -m benchmarks.encode [iterations]
+
+"exact" marks modes whose decoded pixels match the card exactly.
+"""
+
+import io
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageChops, features
+
+from benchmarks.fixtures import case_profiles
+from encoder import encode_image
+from generator import render_image
+
+MODES = {
+    "png (default)": dict(format="png"),
+    "png level 1": dict(format="png", compress_level=1),
+    "png level 9": dict(format="png", compress_level=9),
+    "png filtered": dict(format="png", strategy="filtered"),
+    "png rle": dict(format="png", strategy="rle"),
+    "png rgb": dict(format="png", rgb=True),
+    "png rgb rle": dict(format="png", rgb=True, strategy="rle"),
+    "png 256 colors": dict(format="png", colors=256),
+    "png 64 colors": dict(format="png", colors=64),
+    "webp lossless": dict(format="webp", lossless=True, compress_level=4),
+    "webp lossless fast": dict(format="webp", lossless=True, compress_level=0),
+    "webp lossless rgb": dict(format="webp", lossless=True, rgb=True, compress_level=4),
+    "webp q90": dict(format="webp", quality=90, compress_level=4),
+    "webp q75": dict(format="webp", quality=75, compress_level=4),
+    "jpeg q90": dict(format="jpeg", quality=90),
+    "avif q80": dict(format="avif", quality=80),
+    "avif q60": dict(format="avif", quality=60),
+}
+
+
+def is_exact(card: Image.Image, content: bytes) -> bool:
+    decoded = Image.open(io.BytesIO(content)).convert("RGB")
+    return not ImageChops.difference(card.convert("RGB"), decoded).getbbox()
+
+
+def main(iterations: int = 3) -> None:
+    _, data = next(case_profiles(f"{tempfile.gettempdir()}/enka-card-fixtures"))
+    card = render_image(data, data.characters[0], cache=False)
+
+    baseline = None
+    print(f"{'mode':<20} {'ms':>8} {'bytes':>10} {'size':>6}  exact")
+    for name, options in MODES.items():
+        if options["format"] in ("webp", "avif") and not features.check(
+            options["format"]
+        ):
+            print(f"{name:<20} unsupported by this Pillow build")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            content = encode_image(card, **options)
+        ms = (time.perf_counter() - start) * 1000 / iterations
+
+        baseline = baseline or len(content)
+        print(
+            f"{name:<20} {ms:8.1f} {len(content):10,} {len(content) / baseline:6.0%}"
+            f"  {'yes' if is_exact(card, content) else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,276 @@
+"""Synthetic profiles and placeholder assets, so cards can be rendered
+and compared without network access or downloaded game assets.
+
+    from benchmarks.fixtures import profile, use_asset_dir
+
+    use_asset_dir("/tmp/enka-assets")
+    data = profile("Hydro", constellations=2)
+"""
+
+import os
+import random
+from typing import Iterable, Optional
+
+from enkanetwork import Assets, EnkaNetworkResponse
+from PIL import Image, ImageDraw
+
+import utils
+from fetcher import character_assets
+from store import asset_store
+
+ELEMENTS = ("Pyro", "Hydro", "Electro", "Cryo", "Anemo", "Geo", "Dendro")
+ARTIFACT_SLOTS = (
+    "EQUIP_BRACER",
+    "EQUIP_NECKLACE",
+    "EQUIP_SHOES",
+    "EQUIP_RING",
+    "EQUIP_DRESS",
+)
+
+# FIGHT_PROP ids of the elemental damage bonuses
+DAMAGE_BONUS_PROPS = {
+    "Physical": "30",
+    "Pyro": "40",
+    "Electro": "41",
+    "Hydro": "42",
+    "Dendro": "43",
+    "Anemo": "44",
+    "Geo": "45",
+    "Cryo": "46",
+}
+
+# Placeholder sizes, close to the real assets
+ASSET_SIZES = {"Gacha": (2048, 1024), "UI": (256, 256), "Weapon": (256, 256)}
+ARTIFACT_SIZE = (256, 256)
+
+_ARTIFACT_MAINSTATS = {
+    "EQUIP_BRACER": ("FIGHT_PROP_HP", 4780),
+    "EQUIP_NECKLACE": ("FIGHT_PROP_ATTACK", 311),
+    "EQUIP_SHOES": ("FIGHT_PROP_HP_PERCENT", 46.6),
+    "EQUIP_RING": ("FIGHT_PROP_FIRE_ADD_HURT", 46.6),
+    "EQUIP_DRESS": ("FIGHT_PROP_CRITICAL_HURT", 62.2),
+}
+_SUBSTATS = [
+    {"appendPropId": "FIGHT_PROP_HP", "statValue": 508},
+    {"appendPropId": "FIGHT_PROP_CRITICAL_HURT", "statValue": 21.8},
+    {"appendPropId": "FIGHT_PROP_CRITICAL", "statValue": 3.9},
+    {"appendPropId": "FIGHT_PROP_ELEMENT_MASTERY", "statValue": 40},
+]
+# Text hashes present in the enkanetwork text maps
+_SET_NAME_HASHES = (
+    "1212345779",
+    "2040573235",
+    "2364208851",
+    "3535784755",
+    "4082302819",
+)
+_ARTIFACT_NAME_HASH = "1160889444"
+_WEAPON_NAME_HASH = "3235324891"
+
+
+def character_id(element: str) -> str:
+    """A playable, non-traveler character of `element`."""
+
+    assets = Assets()
+    for avatar_id in assets.CHARACTERS_IDS:
+        character = Assets.character(avatar_id)
+        if (
+            character
+            and character.element.name == element
+            and character.skill_id == 0
+            and len(character.constellations) == 6
+        ):
+            return avatar_id
+
+    raise ValueError(f"No character found for {element}")
+
+
+def _artifact(slot: str, index: int, set_hash: str) -> dict:
+    prop_id, value = _ARTIFACT_MAINSTATS[slot]
+    return {
+        "itemId": 1000 + index,
+        "reliquary": {"level": 21, "mainPropId": 1, "appendPropIdList": []},
+        "flat": {
+            "nameTextMapHash": _ARTIFACT_NAME_HASH,
+            "setNameTextMapHash": set_hash,
+            "rankLevel": 5,
+            "reliquaryMainstat": {"mainPropId": prop_id, "statValue": value},
+            "reliquarySubstats": [dict(x) for x in _SUBSTATS],
+            "itemType": "ITEM_RELIQUARY",
+            "icon": f"UI_RelicIcon_15006_{index}",
+            "equipType": slot,
+        },
+    }
+
+
+def _weapon(substat: bool = True) -> dict:
+    stats = [{"appendPropId": "FIGHT_PROP_BASE_ATTACK", "statValue": 608}]
+    if substat:
+        stats.append({"appendPropId": "FIGHT_PROP_CRITICAL_HURT", "statValue": 66.2})
+
+    return {
+        "itemId": 13501,
+        "weapon": {"level": 90, "promoteLevel": 6, "affixMap": {"113501": 0}},
+        "flat": {
+            "nameTextMapHash": _WEAPON_NAME_HASH,
+            "rankLevel": 5,
+            "weaponStats": stats,
+            "itemType": "ITEM_WEAPON",
+            "icon": "UI_EquipIcon_Pole_Homa",
+        },
+    }
+
+
+def profile(
+    element: str = "Pyro",
+    constellations: int = 6,
+    artifacts: Iterable[str] = ARTIFACT_SLOTS,
+    weapon_name: Optional[str] = None,
+    weapon_substat: bool = True,
+    extra_stats: bool = False,
+    sets: int = 1,
+    uid: int = 604905943,
+) -> EnkaNetworkResponse:
+    """Profile with a single level 90 character.
+
+    `artifacts` lists the equipped slots, `sets` is the number of two-
+    or four-piece bonuses (0-2) and `extra_stats` adds a damage bonus
+    for every element plus healing and shield strength, more than the
+    eight rows the card has room for.
+    """
+
+    avatar_id = character_id(element)
+
+    fight_props = {
+        "1": 15552,
+        "2000": 34000,
+        "4": 715,
+        "2001": 1400,
+        "7": 876,
+        "2002": 1000,
+        "20": 0.70,
+        "22": 2.10,
+        "23": 1.1,
+        "28": 120,
+        DAMAGE_BONUS_PROPS[element]: 0.466,
+    }
+    if extra_stats:
+        for index, prop in enumerate(DAMAGE_BONUS_PROPS.values()):
+            fight_props.setdefault(prop, 0.1 + 0.05 * index)
+        fight_props["26"] = 0.35
+        fight_props["81"] = 0.2
+
+    set_hashes = {
+        0: list(_SET_NAME_HASHES),
+        1: [_SET_NAME_HASHES[0]] * 4 + [_SET_NAME_HASHES[1]],
+        2: [_SET_NAME_HASHES[0]] * 2
+        + [_SET_NAME_HASHES[1]] * 2
+        + [_SET_NAME_HASHES[2]],
+    }[sets]
+    equipment = [
+        _artifact(slot, index, set_hashes[index])
+        for index, slot in enumerate(ARTIFACT_SLOTS)
+        if slot in artifacts
+    ]
+    equipment.append(_weapon(weapon_substat))
+
+    character = Assets.character(avatar_id)
+    avatar = {
+        "avatarId": int(avatar_id),
+        "propMap": {"4001": {"ival": "90"}, "1002": {"ival": "6"}},
+        "talentIdList": character.constellations[:constellations],
+        "fightPropMap": fight_props,
+        "inherentProudSkillList": [],
+        "skillLevelMap": {str(x): 9 for x in character.skills},
+        "equipList": equipment,
+        "fetterInfo": {"expLevel": 10},
+    }
+
+    data = EnkaNetworkResponse.parse_obj(
+        {
+            "playerInfo": {
+                "nickname": "Benchmark",
+                "level": 60,
+                "worldLevel": 8,
+                "nameCardId": 210001,
+                "finishAchievementNum": 1,
+                "towerFloorIndex": 12,
+                "towerLevelIndex": 3,
+                "showAvatarInfoList": [],
+                "profilePicture": {"avatarId": int(avatar_id)},
+            },
+            "avatarInfoList": [avatar],
+            "uid": uid,
+            "ttl": 60,
+        }
+    )
+
+    if weapon_name is not None:
+        data.characters[0].equipments[-1].detail.name = weapon_name
+
+    return data
+
+
+def use_asset_dir(directory: str) -> None:
+    """Read and write downloaded game assets under `directory`."""
+
+    utils.GENSHIN_ASSET_DIR = directory
+    asset_store.root = directory
+    asset_store.manifest_path = os.path.join(directory, "manifest.json")
+    asset_store.index.clear()
+
+
+def make_assets(data: EnkaNetworkResponse, seed: int = 1) -> None:
+    """Draw a deterministic placeholder for every asset the cards of
+    `data` need and that does not exist yet."""
+
+    rng = random.Random(seed)
+    for character in data.characters:
+        for path, _ in character_assets(character):
+            if os.path.exists(path):
+                continue
+
+            folder = os.path.basename(os.path.dirname(path))
+            size = ASSET_SIZES.get(folder, ARTIFACT_SIZE)
+
+            im = Image.new("RGBA", size, (0, 0, 0, 0))
+            draw = ImageDraw.Draw(im)
+            for _ in range(20):
+                x, y = rng.randrange(size[0]), rng.randrange(size[1])
+                draw.ellipse(
+                    (x, y, x + size[0] // 3, y + size[1] // 3),
+                    fill=(
+                        rng.randrange(256),
+                        rng.randrange(256),
+                        rng.randrange(256),
+                        rng.randrange(80, 256),
+                    ),
+                )
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            im.save(path)
+
+
+# Profiles covering the layout's edge cases, by name
+CASES = {
+    **{element.lower(): dict(element=element) for element in ELEMENTS},
+    **{f"c{n}": dict(element="Hydro", constellations=n) for n in range(7)},
+    "no-artifacts": dict(artifacts=()),
+    "missing-artifacts": dict(artifacts=("EQUIP_NECKLACE", "EQUIP_DRESS")),
+    "no-sets": dict(sets=0),
+    "two-sets": dict(sets=2),
+    "long-weapon-name": dict(weapon_name="Everlasting Moonglow of the " * 3),
+    "no-weapon-substat": dict(weapon_substat=False),
+    "extra-stats": dict(element="Anemo", extra_stats=True),
+}
+
+
+def case_profiles(directory: str):
+    """Yield (name, profile) for every case, with placeholder assets
+    drawn under `directory`."""
+
+    use_asset_dir(directory)
+    for name, kwargs in CASES.items():
+        data = profile(**kwargs)
+        make_assets(data)
+        yield name, data
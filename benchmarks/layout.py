@@ -0,0 +1,145 @@
+"""Headless layout check: render every fixture case and compare the
+cards pixel by pixel with references saved from a known good tree.
+
+    python -m benchmarks.layout save REFERENCE_DIR [ASSET_DIR]
+    python -m benchmarks.layout check REFERENCE_DIR [ASSET_DIR]
+
+The digests tests/test_layout.py checks against are those of the cards
+the original generate_image draws, in a checkout of it with the fonts
+copied in (for example `git worktree add /tmp/baseline <commit>`):
+
+    python -m benchmarks.layout digests BASELINE_TREE OUTPUT [ASSET_DIR]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import PIL
+from PIL import Image, ImageChops
+
+from benchmarks.fixtures import case_profiles
+from generator import render_image
+
+# Run in the baseline tree: draws each pickled case with generate_image,
+# which saves the card under output/ rather than returning it
+BASELINE_RENDER = """
+import glob, os, pickle, sys
+from generator import generate_image
+
+with open(sys.argv[1], "rb") as f:
+    profiles = pickle.load(f)
+for name, data in profiles.items():
+    for path in glob.glob("output/*.png"):
+        os.remove(path)
+    generate_image(data, data.characters[0])
+    os.replace(glob.glob("output/*.png")[0], os.path.join(sys.argv[2], name + ".png"))
+"""
+
+
+def card_digest(card: Image.Image) -> str:
+    """sha256 of the size and RGBA pixels of `card`."""
+
+    card = card.convert("RGBA")
+    return hashlib.sha256(repr(card.size).encode() + card.tobytes()).hexdigest()
+
+
+def render_cases(asset_dir: str):
+    for name, data in case_profiles(asset_dir):
+        yield name, render_image(data, data.characters[0], cache=False)
+
+
+def save(reference_dir: str, asset_dir: str) -> None:
+    os.makedirs(reference_dir, exist_ok=True)
+    for name, card in render_cases(asset_dir):
+        card.save(os.path.join(reference_dir, f"{name}.png"))
+        print(f"saved {name}")
+
+
+def check(reference_dir: str, asset_dir: str) -> int:
+    failed = 0
+    for name, card in render_cases(asset_dir):
+        reference = Image.open(os.path.join(reference_dir, f"{name}.png"))
+        if reference.size != card.size:
+            print(f"FAIL {name}: size {card.size} != {reference.size}")
+            failed += 1
+            continue
+
+        # Compare every band: the cards are opaque, their alpha never differs
+        bbox = ImageChops.difference(card, reference.convert(card.mode)).getbbox(
+            alpha_only=False
+        )
+        if bbox:
+            print(f"FAIL {name}: differs in {bbox}")
+            failed += 1
+        else:
+            print(f"ok   {name}")
+
+    return failed
+
+
+def baseline_digests(tree: str, asset_dir: str) -> dict:
+    """Digest of every fixture case drawn by the generate_image of
+    `tree`, whose attributes/Genshin is linked to `asset_dir`."""
+
+    profiles = dict(case_profiles(asset_dir))
+
+    genshin = os.path.join(tree, "attributes", "Genshin")
+    if not os.path.lexists(genshin):
+        os.symlink(os.path.abspath(asset_dir), genshin)
+    elif os.path.realpath(genshin) != os.path.realpath(asset_dir):
+        raise SystemExit(f"{genshin} already exists, remove it first")
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiles_path = os.path.join(directory, "profiles.pickle")
+        with open(profiles_path, "wb") as f:
+            pickle.dump(profiles, f)
+
+        subprocess.run(
+            [sys.executable, "-c", BASELINE_RENDER, profiles_path, directory],
+            cwd=tree,
+            check=True,
+        )
+
+        return {
+            name: card_digest(Image.open(os.path.join(directory, f"{name}.png")))
+            for name in profiles
+        }
+
+
+def main(args) -> int:
+    if len(args) < 2 or args[0] not in ("save", "check", "digests"):
+        print(__doc__)
+        return 2
+
+    if args[0] == "digests":
+        if len(args) < 3:
+            print(__doc__)
+            return 2
+
+        asset_dir = args[3] if len(args) > 3 else tempfile.mkdtemp()
+        cases = baseline_digests(args[1], asset_dir)
+        digests = dict(pillow=PIL.__version__, cases=cases)
+        with open(args[2], "w") as f:
+            json.dump(digests, f, indent=2)
+            f.write("\n")
+        return 0
+
+    asset_dir = (
+        args[2]
+        if len(args) > 2
+        else os.path.join(tempfile.gettempdir(), "enka-card-fixtures")
+    )
+    if args[0] == "save":
+        save(args[1], asset_dir)
+        return 0
+
+    return 1 if check(args[1], asset_dir) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Stat name lookups: Assets(lang=...) per card versus the preloaded
+locale registry, and the registry's memory footprint.
+
+    python -m benchmarks.locales [iterations]
+"""
+
+import sys
+import time
+
+from enkanetwork import Assets, Language
+
+from locales import STAT_PROPS, LocaleRegistry
+
+
+def per_card_assets(locale: Language) -> None:
+    assets = Assets(lang=locale)
+    for prop in STAT_PROPS[:8]:
+        assets.get_hash_map(prop)
+
+
+def main(iterations: int = 20) -> None:
+    locales = list(Language)
+
+    start = time.perf_counter()
+    for index in range(iterations):
+        per_card_assets(locales[index % len(locales)])
+    assets_ms = (time.perf_counter() - start) / iterations * 1000
+
+    registry = LocaleRegistry()
+    start = time.perf_counter()
+    registry.preload()
+    preload_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for index in range(iterations):
+        locale = locales[index % len(locales)]
+        for prop in STAT_PROPS[:8]:
+            registry.stat_name(prop, locale)
+    registry_ms = (time.perf_counter() - start) / iterations * 1000
+
+    print(f"Assets(lang) per card:   {assets_ms:8.3f} ms")
+    print(f"registry per card:       {registry_ms:8.3f} ms")
+    print(f"registry preload:        {preload_ms:8.3f} ms ({len(locales)} languages)")
+    print()
+    for name, size in registry.footprint().items():
+        print(f"{name:>6} {size:8,} bytes")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,94 @@
+"""Mask fades: reloading the mask per call (the cache=False fallback),
+cached masks with Pillow band operations, cached faded icons, and a
+NumPy version of the same arithmetic for comparison.
+
+    python -m benchmarks.masks [iterations]
+"""
+
+import sys
+import time
+
+from PIL import Image, ImageChops
+
+from utils import (CHARACTER_MASK, fade_asset_icon, fade_character_art,
+                   get_mask, open_image)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ARTIFACT_MASK = "attributes/Assets/artifact_mask.png"
+
+
+def numpy_character_art(im: Image.Image) -> Image.Image:
+    pixels = np.asarray(im).copy()
+    alpha = pixels[..., 3] * np.asarray(
+        get_mask(CHARACTER_MASK, im.size, True), np.uint16
+    )
+    # x // 255 for x <= 255 * 255, matching ImageChops.multiply
+    alpha += 1 + (alpha >> 8)
+    pixels[..., 3] = alpha >> 8
+    return Image.fromarray(pixels)
+
+
+def numpy_asset_icon(im: Image.Image) -> Image.Image:
+    mask = np.asarray(get_mask(ARTIFACT_MASK, im.size), np.uint16)[..., None]
+    pixels = np.asarray(im) * mask
+    # Pillow's rounded divide by 255 used when pasting through a mask
+    pixels += 128
+    pixels += pixels >> 8
+    return Image.fromarray((pixels >> 8).astype(np.uint8))
+
+
+def measure(fn, im: Image.Image, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(im)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def compare(name: str, im: Image.Image, paths: dict, iterations: int) -> None:
+    print(f"{name} {im.size[0]}x{im.size[1]}")
+
+    expected = None
+    for label, fn in paths.items():
+        ms = measure(fn, im, iterations)
+        result = fn(im)
+        if expected is None:
+            expected = result
+
+        diff = ImageChops.difference(expected, result)
+        max_diff = max(high for _, high in diff.getextrema())
+        print(f"  {label:<24}{ms:8.3f} ms  (max channel difference {max_diff})")
+
+
+def main(iterations: int = 100) -> None:
+    # Static stand-ins at the sizes the card uses, the icon is faded
+    # outside the asset cache unless it is the cached copy
+    icon_path = "attributes/UI/COMPANIONSHIP.png"
+    icon = open_image(icon_path, resize=(190, 190), cache=False)
+    cached_icon = open_image(icon_path, resize=(190, 190))
+    art = open_image("attributes/Assets/default_enka_card.png", resize=(1228, 836))
+
+    icon_paths = {
+        "mask per call": lambda im: fade_asset_icon(im, "artifact", cache=False),
+        "cached mask": lambda im: fade_asset_icon(im, "artifact"),
+        "cached result": lambda im: fade_asset_icon(cached_icon, "artifact"),
+    }
+    art_paths = {
+        "mask per call": lambda im: fade_character_art(im, cache=False),
+        "cached mask": fade_character_art,
+        "in place (+ caller copy)": lambda im: fade_character_art(im.copy(), True),
+    }
+
+    if np is not None:
+        icon_paths["numpy"] = numpy_asset_icon
+        art_paths["numpy"] = numpy_character_art
+
+    compare("fade_asset_icon", icon, icon_paths, iterations)
+    compare("fade_character_art", art, art_paths, iterations)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""Worker cold start and memory: decoding the static PNGs versus
+mapping the prebuilt asset pack (python pack.py).
+
+    python -m benchmarks.pack [workers]
+
+Each worker is a separate process kept alive until all of them have
+loaded, so the proportional set size (PSS) shows the shared pages.
+"""
+
+import subprocess
+import sys
+
+from pack import get_asset_pack, static_asset_paths
+
+WORKER = """
+import sys, time
+import pack, utils
+if sys.argv[1] == "decode":
+    # No pack: every asset is decoded from its PNG
+    utils.get_asset_pack = lambda: pack.AssetPack("")
+
+start = time.perf_counter()
+utils.preload_static_assets()
+elapsed = time.perf_counter() - start
+
+memory = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        name, _, value = line.partition(":")
+        if name in ("Rss", "Pss"):
+            memory[name] = int(value.split()[0])
+
+print(elapsed * 1000, memory["Rss"], memory["Pss"], flush=True)
+sys.stdin.read()
+"""
+
+
+def run(mode: str, workers: int) -> None:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    results = [list(map(float, p.stdout.readline().split())) for p in procs]
+    for p in procs:
+        p.communicate("")
+
+    load_ms = sum(r[0] for r in results) / workers
+    rss = sum(r[1] for r in results) / 1024
+    pss = sum(r[2] for r in results) / 1024
+    print(
+        f"{mode:>6}: {load_ms:8.1f} ms to load, "
+        f"RSS {rss:7.1f} MB, PSS {pss:7.1f} MB over {workers} workers"
+    )
+
+
+def main(workers: int = 4) -> None:
+    pack = get_asset_pack()
+    if not pack:
+        print("No asset pack, build it first with: python pack.py")
+        return
+
+    print(f"{len(pack)} of {len(static_asset_paths())} static assets packed")
+    print(f"pack size {pack.nbytes / 1024 / 1024:.1f} MB")
+    print()
+
+    run("decode", workers)
+    run("pack", workers)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,206 @@
+"""Render benchmark over the synthetic fixture cases, offline.
+
+    python -m benchmarks.render [--iterations N] [--cache none|tiles|card]
+                                [--output results.json]
+                                [--baseline baseline.json] [--threshold 0.10]
+
+Reports p50/p95 latency per case and overall, throughput, peak RSS
+and where the time goes per card (the metrics.py phases, which
+nest: decode and fade count towards banner too). Results are written as JSON; with
+--baseline, cases whose p50 regressed by more than --threshold are
+listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import PIL
+
+import generator
+from benchmarks.fixtures import case_profiles
+from encoder import encode_image
+from generator import render_bytes, render_image
+from metrics import metrics
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    index = (len(values) - 1) * q
+    low = int(index)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (index - low)
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def render_once(data, cache: str) -> None:
+    character = data.characters[0]
+    if cache == "card":
+        render_bytes(data, character)
+    else:
+        card = render_image(data, character, cache=cache == "tiles")
+        encode_image(card)
+
+
+def run(iterations: int, cache: str, asset_dir: str) -> dict:
+    cases = dict(case_profiles(asset_dir))
+    generator.preload_assets()
+
+    # One untimed pass, so every case starts from warm asset caches
+    for data in cases.values():
+        render_once(data, cache)
+
+    metrics.reset()
+    metrics.enable()
+
+    results = {}
+    latencies = []
+    start = time.perf_counter()
+    for name, data in cases.items():
+        case_latencies = []
+        for _ in range(iterations):
+            card_start = time.perf_counter()
+            render_once(data, cache)
+            case_latencies.append(time.perf_counter() - card_start)
+
+        results[name] = summarize(case_latencies)
+        latencies += case_latencies
+    elapsed = time.perf_counter() - start
+
+    metrics.enable(False)
+    snapshot = metrics.snapshot()
+
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "cache": cache,
+        },
+        "summary": {
+            **summarize(latencies),
+            "cards": len(latencies),
+            "cards_per_second": len(latencies) / elapsed,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "phases_ms": {
+            name: phase["seconds"] * 1000 / len(latencies)
+            for name, phase in sorted(snapshot["phases"].items())
+        },
+        "counters": snapshot["counters"],
+        "caches": snapshot["caches"],
+        "cases": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Cases whose p50 is more than `threshold` slower than in `baseline`."""
+
+    regressions = []
+    for name, case in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+
+        change = case["p50_ms"] / before["p50_ms"] - 1
+        if change > threshold:
+            regressions.append(
+                f"{name}: p50 {before['p50_ms']:.1f} -> {case['p50_ms']:.1f} ms "
+                f"(+{change:.0%})"
+            )
+
+    return regressions
+
+
+def report(results: dict) -> None:
+    summary = results["summary"]
+    print(f"{'case':<20} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, case in results["cases"].items():
+        print(f"{name:<20} {case['p50_ms']:8.1f} {case['p95_ms']:8.1f}")
+
+    print()
+    print(
+        f"{summary['cards']} cards: p50 {summary['p50_ms']:.1f} ms, "
+        f"p95 {summary['p95_ms']:.1f} ms, "
+        f"{summary['cards_per_second']:.1f} cards/s, "
+        f"peak RSS {summary['peak_rss_mb']:.0f} MB"
+    )
+
+    print()
+    print("per card:")
+    for phase, ms in results["phases_ms"].items():
+        print(f"  {phase:<24} {ms:8.2f} ms")
+
+    print()
+    for name, stats in results["caches"].items():
+        print(
+            f"  {name + ' cache':<24} {stats['hits']:8} hits {stats['misses']:8} misses"
+        )
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument(
+        "--cache",
+        choices=("none", "tiles", "card"),
+        default="none",
+        help="caches enabled while rendering (default none: full renders)",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--assets",
+        default=f"{tempfile.gettempdir()}/enka-card-fixtures",
+        help="directory for the placeholder game assets",
+    )
+    args = parser.parse_args(args)
+
+    results = run(args.iterations, args.cache, args.assets)
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        print()
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%} against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
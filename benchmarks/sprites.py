@@ -0,0 +1,96 @@
+"""Paste time per card: repeated "thickening" pastes versus
+precomposited stacked sprites.
+
+    python -m benchmarks.sprites [iterations]
+"""
+
+import sys
+import time
+
+from PIL import Image, ImageChops
+
+from atlas import get_stat_icon
+from sprites import STACKED_SPRITE_TOLERANCE, paste_stacked
+from utils import open_image, scale_image
+
+
+def card_pastes():
+    """The stacked pastes one fully built card performs, using static
+    assets in place of the downloaded skill and constellation icons."""
+
+    talent_overlay = scale_image(
+        open_image("attributes/Assets/enka_talent_overlay.png"), fixed_height=80
+    )
+    skill = open_image("attributes/UI/PYRO.png", resize=(50, 50))
+    constellation = scale_image(open_image("attributes/UI/HYDRO.png"), fixed_height=45)
+    stats = [
+        "FIGHT_PROP_BASE_ATTACK",
+        "FIGHT_PROP_CRITICAL_HURT",
+        "FIGHT_PROP_HP",
+        "FIGHT_PROP_ATTACK",
+        "FIGHT_PROP_DEFENSE",
+        "FIGHT_PROP_ELEMENT_MASTERY",
+        "FIGHT_PROP_CRITICAL",
+        "FIGHT_PROP_CRITICAL_HURT",
+        "FIGHT_PROP_CHARGE_EFFICIENCY",
+        "FIGHT_PROP_FIRE_ADD_HURT",
+        "FIGHT_PROP_HP",
+        "FIGHT_PROP_ATTACK",
+        "FIGHT_PROP_HP_PERCENT",
+        "FIGHT_PROP_FIRE_ADD_HURT",
+        "FIGHT_PROP_CRITICAL",
+    ]
+
+    pastes = []
+    for index in range(3):
+        pastes.append((talent_overlay, (430, 305 + 90 * index), 4))
+        pastes.append((skill, (446, 320 + 90 * index), 3))
+    for index in range(6):
+        pastes.append((constellation, (41, 175 + 60 * index), 3))
+    for index, prop_id in enumerate(stats):
+        pastes.append((get_stat_icon(prop_id), (555 + 30 * index, 180), 3))
+
+    return pastes
+
+
+def render(pastes, precomposite: bool) -> Image.Image:
+    canvas = Image.new("RGBA", (1449, 610), (0, 0, 0, 0))
+    for im, xy, times in pastes:
+        paste_stacked(canvas, im, xy, times, precomposite=precomposite)
+    return canvas
+
+
+def measure(pastes, precomposite: bool, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(pastes, precomposite)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main(iterations: int = 200) -> None:
+    pastes = card_pastes()
+
+    start = time.perf_counter()
+    stacked = render(pastes, True)
+    cold = (time.perf_counter() - start) * 1000
+
+    diff = ImageChops.difference(render(pastes, False), stacked)
+    max_diff = max(high for _, high in diff.getextrema())
+
+    legacy_ms = measure(pastes, False, iterations)
+    stacked_ms = measure(pastes, True, iterations)
+
+    print(f"pastes per card:        {sum(t for _, _, t in pastes)} -> {len(pastes)}")
+    print(f"repeated pastes:        {legacy_ms:.3f} ms/card")
+    print(
+        f"stacked sprites:        {stacked_ms:.3f} ms/card (first card {cold:.3f} ms)"
+    )
+    print(f"saved:                  {legacy_ms - stacked_ms:.3f} ms/card")
+    print(f"max channel difference: {max_diff} (tolerance {STACKED_SPRITE_TOLERANCE})")
+
+    if max_diff > STACKED_SPRITE_TOLERANCE:
+        sys.exit("stacked sprites exceed the pixel tolerance")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
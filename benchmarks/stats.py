@@ -0,0 +1,60 @@
+"""Time statistic_rows per card, over profiles ranging from base stats
+only to more rows than the card has room for.
+
+    python -m benchmarks.stats [iterations]
+
+The rows it selects are checked by tests/test_statistics.py.
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+from enkanetwork.enum import ElementType
+from enkanetwork.model.stats import CharacterStats
+
+from utils import statistic_rows
+
+# fightPropMap of a level 90 character: base and total HP, ATK and DEF
+BASE_PROPS = {
+    "1": 15552,
+    "2000": 34000.4,
+    "4": 715.2,
+    "2001": 1400,
+    "7": 876,
+    "2002": 1000,
+}
+# Elemental mastery, crit rate, crit damage and energy recharge
+COMMON_PROPS = {"28": 120, "20": 0.7, "22": 2.1, "23": 1.1}
+
+# (element, extra fightPropMap entries)
+PROFILES = [
+    ("Pyro", {}),
+    ("Pyro", {**COMMON_PROPS, "40": 0.466}),
+    ("Hydro", {**COMMON_PROPS, "26": 0.35}),
+    ("Pyro", {**COMMON_PROPS, "26": 0.35, "81": 0.2, "40": 0.466}),
+    ("Hydro", {**COMMON_PROPS, "40": 0.466, "42": 0.466, "30": 0.466}),
+    ("Geo", {**COMMON_PROPS, "45": 0.466, "46": 0.466, "40": 0.1}),
+]
+
+
+def character(element: str, props: dict) -> SimpleNamespace:
+    """Just the parts of a CharacterInfo statistic_rows reads."""
+
+    return SimpleNamespace(
+        stats=CharacterStats(**BASE_PROPS, **props), element=ElementType[element]
+    )
+
+
+def main(iterations: int = 10000) -> None:
+    characters = [character(*profile) for profile in PROFILES]
+    start = time.perf_counter()
+    for index in range(iterations):
+        statistic_rows(characters[index % len(characters)])
+    elapsed = (time.perf_counter() - start) / iterations
+
+    print(f"statistic_rows per card: {elapsed * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
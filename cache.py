@@ -0,0 +1,231 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PIL import Image
+
+from asset_io import atomic_write
+
+
+def image_nbytes(im: Image.Image) -> int:
+    """Approximate in-memory size of a decoded image."""
+    return im.width * im.height * len(im.getbands())
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache.
+
+    Entries are evicted oldest-first once either the byte budget
+    (measured with `sizeof`) or the item cap is exceeded. A value
+    larger than the whole budget is returned but never stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_items: Optional[int] = None,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+
+        return value
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, building and
+        storing it with `factory` on a miss."""
+
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, factory())
+        return value
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            or (self.max_items is not None and len(self._entries) > self.max_items)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+class DerivedImageCache:
+    """Two-tier cache for images derived from other assets.
+
+    Results live in an in-memory LRU and, when `directory` is set,
+    are also written there as lossless PNG or WebP files so that
+    they survive restarts and can be shared between processes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        directory: Optional[str] = None,
+        format: str = "png",
+    ) -> None:
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=image_nbytes)
+        self.directory = directory
+        self.format = format
+        self.disk_hits = 0
+
+    def get_or_create(
+        self, key: str, factory: Callable[[], Image.Image]
+    ) -> Image.Image:
+        image = self.memory.get(key)
+        if image is not None:
+            return image
+
+        if self.directory:
+            path = self._path(key)
+            if os.path.exists(path):
+                image = Image.open(path).convert("RGBA")
+                self.disk_hits += 1
+                return self.memory.put(key, image)
+
+        image = factory()
+        if self.directory:
+            self._write(key, image)
+
+        return self.memory.put(key, image)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.format}")
+
+    def _write(self, key: str, image: Image.Image) -> None:
+        if self.format == "webp":
+            options = {"lossless": True, "exact": True}
+        else:
+            options = {}
+
+        atomic_write(
+            self._path(key), lambda f: image.save(f, format=self.format, **options)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.memory.stats(), "disk_hits": self.disk_hits}
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk_hits = 0
+
+
+class BlobCache:
+    """Two-tier cache for encoded bytes, such as finished cards.
+
+    Entries live in an in-memory LRU bounded by `max_bytes` and, when
+    `directory` is set, are also written there so that they survive
+    restarts and can be shared between processes.
+    """
+
+    def __init__(
+        self, max_bytes: Optional[int] = None, directory: Optional[str] = None
+    ) -> None:
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=len)
+        self.directory = directory
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        content = self.memory.get(key)
+        if content is not None:
+            return content
+
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                self.disk_hits += 1
+                return self.memory.put(key, content)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, content: bytes) -> bytes:
+        if self.directory:
+            atomic_write(self._path(key), content)
+
+        return self.memory.put(key, content)
+
+    def get_or_create(self, key: str, factory: Callable[[], bytes]) -> bytes:
+        content = self.get(key)
+        if content is None:
+            content = self.put(key, factory())
+        return content
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.memory.hits + self.disk_hits
+        requests = hits + self.misses
+        return {
+            **self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / requests if requests else 0.0,
+        }
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk_hits = 0
+        self.misses = 0
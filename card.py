@@ -0,0 +1,170 @@
+from typing import NamedTuple, Optional, Tuple, Union
+
+from enkanetwork import EnkaNetworkResponse
+from enkanetwork.enum import DigitType, EquipmentsType
+from enkanetwork.model.character import CharacterInfo
+from enkanetwork.model.equipments import Equipments, EquipmentsStats
+
+from prop_reference import SUBST_ORDER
+from utils import StatRow, get_active_artifact_sets, statistic_rows
+
+# Artifact slots in the order their panels are drawn
+ARTIFACT_POSITIONS = [
+    "EQUIP_BRACER",
+    "EQUIP_NECKLACE",
+    "EQUIP_SHOES",
+    "EQUIP_RING",
+    "EQUIP_DRESS",
+]
+
+
+class Icon(NamedTuple):
+    filename: str
+    url: str
+
+
+class Stat(NamedTuple):
+    prop_id: str
+    value: Union[int, float]
+    percent: bool
+
+
+class Weapon(NamedTuple):
+    name: str
+    icon: Icon
+    rarity: int
+    level: int
+    max_level: int
+    refinement: int
+    mainstat: Stat
+    # Weapons without a secondary stat have none
+    substat: Optional[Stat]
+
+
+class Artifact(NamedTuple):
+    icon: Icon
+    rarity: int
+    level: int
+    mainstat: Stat
+    # In SUBST_ORDER, the order they are drawn in
+    substats: Tuple[Stat, ...]
+
+
+class Skill(NamedTuple):
+    icon: Icon
+    level: int
+    is_boosted: bool
+
+
+class SetBonus(NamedTuple):
+    name: str
+    count: int
+
+
+class Player(NamedTuple):
+    uid: int
+    nickname: str
+    level: int
+    world_level: int
+
+
+class CardData(NamedTuple):
+    """Everything a card draws, extracted once from the API models.
+
+    Plain nested tuples: immutable, hashable (usable as a cache key
+    as is) and cheap to pickle to process-pool workers, unlike the
+    pydantic models they are read from. Build with from_api().
+    """
+
+    player: Player
+    character_id: int
+    name: str
+    element: str
+    banner: Icon
+    level: int
+    max_level: int
+    friendship_level: int
+    constellations: Tuple[Icon, ...]
+    constellations_unlocked: int
+    skills: Tuple[Skill, ...]
+    weapon: Weapon
+    # One per ARTIFACT_POSITIONS slot, None when the slot is empty
+    artifacts: Tuple[Optional[Artifact], ...]
+    sets: Tuple[SetBonus, ...]
+    stats: Tuple[StatRow, ...]
+
+    @classmethod
+    def from_api(
+        cls, data: EnkaNetworkResponse, character: CharacterInfo
+    ) -> "CardData":
+        """Extract the card of `character`, leaving the models untouched."""
+
+        artifacts = {}
+        for equipment in character.equipments:
+            if equipment.type == EquipmentsType.ARTIFACT:
+                artifacts.setdefault(equipment.detail.artifact_type.value, equipment)
+
+        return cls(
+            player=Player(
+                data.uid,
+                data.player.nickname,
+                data.player.level,
+                data.player.world_level,
+            ),
+            character_id=character.id,
+            name=character.name,
+            element=character.element.name,
+            banner=_icon(character.image.banner),
+            level=character.level,
+            max_level=character.max_level,
+            friendship_level=character.friendship_level,
+            constellations=tuple(_icon(x.icon) for x in character.constellations),
+            constellations_unlocked=character.constellations_unlocked,
+            skills=tuple(
+                Skill(_icon(x.icon), x.level, x.is_boosted) for x in character.skills
+            ),
+            weapon=_weapon(character.equipments[-1]),
+            artifacts=tuple(
+                _artifact(artifacts[slot]) if slot in artifacts else None
+                for slot in ARTIFACT_POSITIONS
+            ),
+            sets=tuple(
+                SetBonus(x.name, x.count)
+                for x in get_active_artifact_sets(character.equipments)
+            ),
+            stats=statistic_rows(character),
+        )
+
+
+def _icon(icon) -> Icon:
+    return Icon(icon.filename, icon.url)
+
+
+def _stat(stat: EquipmentsStats) -> Stat:
+    return Stat(stat.prop_id, stat.value, stat.type == DigitType.PERCENT)
+
+
+def _weapon(weapon: Equipments) -> Weapon:
+    detail = weapon.detail
+    return Weapon(
+        detail.name,
+        _icon(detail.icon),
+        detail.rarity,
+        weapon.level,
+        weapon.max_level,
+        weapon.refinement,
+        _stat(detail.mainstats),
+        _stat(detail.substats[0]) if detail.substats else None,
+    )
+
+
+def _artifact(artifact: Equipments) -> Artifact:
+    detail = artifact.detail
+    substats = sorted(detail.substats, key=lambda x: SUBST_ORDER.index(x.prop_id))
+    return Artifact(
+        _icon(detail.icon),
+        detail.rarity,
+        artifact.level,
+        _stat(detail.mainstats),
+        tuple(_stat(x) for x in substats),
+    )
@@ -0,0 +1,180 @@
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from enkanetwork.enum import EquipmentsType
+from enkanetwork.model.character import CharacterInfo
+
+from asset_io import AssetDownloadError, AssetLock
+from metrics import metrics
+from store import asset_store
+from utils import genshin_asset_path
+
+# (local path, source url) of an asset a card draws
+AssetRef = Tuple[str, str]
+
+
+def character_assets(character: CharacterInfo) -> List[AssetRef]:
+    """Every downloadable asset generate_image draws for `character`."""
+
+    assets = [
+        (
+            genshin_asset_path("Gacha", character.image.banner.filename),
+            character.image.banner.url,
+        )
+    ]
+
+    for constellation in character.constellations:
+        assets.append(
+            (
+                genshin_asset_path("UI", constellation.icon.filename),
+                constellation.icon.url,
+            )
+        )
+
+    for skill in character.skills:
+        assets.append((genshin_asset_path("UI", skill.icon.filename), skill.icon.url))
+
+    for equipment in character.equipments:
+        folder = "Weapon" if equipment.type == EquipmentsType.WEAPON else "Artifact"
+        icon = equipment.detail.icon
+        assets.append((genshin_asset_path(folder, icon.filename), icon.url))
+
+    return assets
+
+
+class AssetFetcher:
+    """Async asset downloader sharing one pooled HTTP session.
+
+    At most `concurrency` downloads run at once. Each request is
+    bounded by `timeout` seconds, and connection errors, timeouts and
+    5xx/429 responses are retried `retries` times with exponential
+    backoff before raising AssetDownloadError.
+
+    Concurrent requests for the same asset share one download, also
+    across processes through an AssetLock, and files are validated and
+    written atomically so a failed download never leaves a partial file.
+
+    Usage:
+        async with AssetFetcher() as fetcher:
+            await fetcher.prefetch(data.characters)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.downloads = 0
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "AssetFetcher":
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=self.timeout,
+            )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, path: str, url: str) -> str:
+        """Download `url` to `path` unless it already exists."""
+
+        if path in asset_store:
+            return path
+
+        task = self._inflight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(path, url))
+            self._inflight[path] = task
+            task.add_done_callback(lambda _: self._inflight.pop(path, None))
+
+        # One cancelled waiter must not cancel the download for the others
+        await asyncio.shield(task)
+
+        return path
+
+    async def _fetch(self, path: str, url: str) -> None:
+        lock = AssetLock(path)
+        await asyncio.to_thread(lock.acquire)
+
+        try:
+            # Another process may have downloaded it while we waited
+            if os.path.exists(path):
+                return
+
+            async with self._semaphore:
+                with metrics.phase("download"):
+                    content = await self._download(url)
+
+            await asyncio.to_thread(asset_store.write, path, content, url)
+            self.downloads += 1
+            metrics.count("asset_downloads")
+        finally:
+            lock.release()
+
+    async def _download(self, url: str) -> bytes:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session.get(url, timeout=self.timeout) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                        )
+                    if response.status != 200:
+                        raise AssetDownloadError(
+                            f"There was an error downloading the asset "
+                            f"({response.status}): {url}"
+                        )
+
+                    return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise AssetDownloadError(
+                        f"There was an error downloading the asset: {url}"
+                    ) from e
+
+                await asyncio.sleep(self.backoff * 2**attempt)
+
+    async def fetch_all(
+        self, assets: Iterable[AssetRef], return_exceptions: bool = False
+    ) -> List[str]:
+        """Download every (path, url) pair concurrently and record
+        them in the asset store manifest."""
+
+        unique = dict(assets)
+        try:
+            return await asyncio.gather(
+                *(self.fetch(path, url) for path, url in unique.items()),
+                return_exceptions=return_exceptions,
+            )
+        finally:
+            await asyncio.to_thread(asset_store.save)
+
+    async def prefetch(self, characters: Iterable[CharacterInfo]) -> List[str]:
+        """Download everything the cards for `characters` need,
+        so layout never waits on the network."""
+
+        return await self.fetch_all(
+            asset for character in characters for asset in character_assets(character)
+        )
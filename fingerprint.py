@@ -0,0 +1,27 @@
+import hashlib
+import json
+
+from enkanetwork import Language
+
+from card import CardData
+from layers import mask_version
+
+# Bump whenever a change to generator.py alters the pixels of a card,
+# so cached cards from the previous layout are not served anymore
+LAYOUT_VERSION = 1
+
+
+def card_fingerprint(card: CardData, locale: Language = Language.EN, *options) -> str:
+    """Stable hash of everything generate_image draws for a card.
+
+    Two requests with the same fingerprint render the same card: it
+    covers the whole CardData (character, weapon, artifacts, stats and
+    the player info shown on the card), the locale and the layout and
+    mask versions. Extra `options` (output format, compression, ...)
+    are hashed as well.
+    """
+
+    state = [LAYOUT_VERSION, mask_version(), locale.value, card, list(options)]
+
+    encoded = json.dumps(state, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
@@ -0,0 +1,94 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from PIL import ImageFont
+
+from metrics import metrics
+
+FONT_FAMILIES = {
+    "normal": "attributes/Fonts/JA-JP.TTF",
+    # Insert other fonts you'd like to use here, if any
+}
+
+# Every font size drawn by generator.generate_image
+LAYOUT_FONT_SIZES = (12, 14, 16, 17, 18, 20, 22, 23, 27, 30)
+
+FontVariation = Union[str, Tuple[float, ...], None]
+FontKey = Tuple[str, int, FontVariation]
+
+
+class FontRegistry:
+    """Process-wide registry of loaded fonts.
+
+    Faces are keyed on (family, size, variation) and parsed from disk
+    only once, then shared by every render in the process. Unknown
+    families fall back to the "normal" font, same as before.
+    """
+
+    def __init__(self, families: Dict[str, str] = FONT_FAMILIES) -> None:
+        self.families = dict(families)
+        self.hits = 0
+        self.misses = 0
+        self._fonts: Dict[FontKey, ImageFont.FreeTypeFont] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, family: str, size: int, variation: FontVariation = None
+    ) -> ImageFont.FreeTypeFont:
+        key = (family, size, variation)
+
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        with self._lock:
+            # Another thread may have loaded the face while we waited
+            font = self._fonts.get(key)
+            if font is not None:
+                self.hits += 1
+                return font
+
+            self.misses += 1
+            font = self._load(family, size, variation)
+            self._fonts[key] = font
+
+        return font
+
+    def _load(
+        self, family: str, size: int, variation: FontVariation
+    ) -> ImageFont.FreeTypeFont:
+        path = self.families.get(family, self.families["normal"])
+        font = ImageFont.truetype(path, size)
+
+        if isinstance(variation, str):
+            font.set_variation_by_name(variation)
+        elif variation is not None:
+            font.set_variation_by_axes(list(variation))
+
+        return font
+
+    def warm(
+        self,
+        sizes: Iterable[int] = LAYOUT_FONT_SIZES,
+        families: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Load every (family, size) pair up front so the first
+        render doesn't pay for parsing the font files."""
+
+        for family in families or self.families:
+            for size in sizes:
+                self.get(family, size)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "loaded": len(self._fonts)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fonts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+font_registry = FontRegistry()
+metrics.register_collector("font", font_registry.stats)
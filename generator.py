@@ -1,714 +1,941 @@
+import asyncio
 import os
-import re
 import textwrap
+from concurrent.futures import Executor
 from datetime import datetime
+from functools import lru_cache, partial
+from typing import List, Optional, Tuple
 
-from enkanetwork import Assets, EnkaNetworkResponse, Language
-from enkanetwork.enum import DigitType, EquipmentsType
+from enkanetwork import EnkaNetworkResponse, Language
 from enkanetwork.model.character import CharacterInfo
-from enkanetwork.model.equipments import Equipments, EquipmentsType, EquipType
-from PIL import Image, ImageChops, ImageDraw, ImageEnhance
+from PIL import Image, ImageDraw, ImageEnhance
+
+from atlas import get_stat_icon, get_stat_icon_atlas
+from cache import BlobCache
+from card import Artifact, CardData, Player, SetBonus, Skill, Stat, Weapon
+from encoder import (DEFAULT_COMPRESS_LEVEL, DEFAULT_QUALITY, FILE_EXTENSIONS,
+                     ImageFormat, encode_image, save_image)
+from fetcher import AssetFetcher, character_assets
+from fingerprint import card_fingerprint
+from glyphs import measure
+from layers import (get_background, get_background_rgb, get_character_layer,
+                    mask_version, preload_backgrounds)
+from layout import (FOREGROUND, TEXTGROUND, Line, Op, Paste, Polygon, Rect,
+                    Text, drawer)
+from locales import locale_registry, stat_name
+from metrics import metrics
+from prop_reference import RARITY_REFERENCE
+from store import asset_store
+from tiles import Region, compose_card
+from utils import (StatRow, brighten, fade_asset_icon, genshin_asset_path,
+                   open_image, preload_static_assets, scale_image)
+
+# Encoded cards keyed on their fingerprint, set card_cache.directory
+# to also keep them on disk across restarts
+CARD_CACHE_BYTES = 64 * 1024 * 1024
+
+card_cache = BlobCache(max_bytes=CARD_CACHE_BYTES)
+metrics.register_collector("card", card_cache.stats)
+
+
+def preload_assets() -> None:
+    """Warm the asset cache with every static image, plus the
+    scaled variants generate_image draws, and the stat names of
+    every language, so that the first card renders as fast as
+    the ones after it."""
+
+    asset_store.load()
+    locale_registry.preload()
+    preload_static_assets()
+    preload_backgrounds()
+    get_stat_icon_atlas()
+
+    for rarity in RARITY_REFERENCE.values():
+        light = open_image(f"attributes/UI/{rarity}_WEAPON_LIGHT.png")
+        scale_image(light, fixed_height=40)
+
+        stars = open_image(f"attributes/UI/{rarity}.png")
+        for height in (25, 18):
+            brighten(scale_image(stars, fixed_height=height), 0)
+
+    overlays = {
+        "attributes/UI/COMPANIONSHIP.png": 45,
+        "attributes/Assets/enka_constellation_overlay.png": 75,
+        "attributes/Assets/enka_talent_overlay.png": 80,
+    }
+    for path, height in overlays.items():
+        scale_image(open_image(path), fixed_height=height)
+
+    open_image("attributes/UI/LOCKED.png", resize=(20, 25))
+    open_image("attributes/Assets/flower_of_life_icon.png", resize=(35, 35))
+
+
+# Text colors
+GREEN = (150, 255, 169)
+WHITE = (255, 255, 255)
+LIGHTER_GREY = (255, 255, 255, 150)
+BEIGE = (245, 222, 179)
+
+""" LAYOUT """
+# Top-left corners of the blocks, and the distance between repeated ones
+HEADER_ORIGIN = (38, 35)
+CONSTELLATION_ORIGIN = (25, 160)
+CONSTELLATION_SPACING = 60
+TALENT_ORIGIN = (430, 305)
+TALENT_SPACING = 90
+WEAPON_ORIGIN = (555, 25)
+WEAPON_INFO_X = 690
+STATS_ORIGIN = (555, 180)
+STATS_HEIGHT = 365
+STAT_VALUE_X = 967
+ARTIFACT_ORIGIN = (1009, 14)
+ARTIFACT_PANEL_SIZE = (440, 105)
+ARTIFACT_SPACING = 119
+SETS_ORIGIN = (555, 547)
+# UID, then world level and adventure rank on the next line
+PLAYER_ORIGIN = (38, 545)
+PLAYER_LINE_SPACING = 25
+# Centers of the first set bonus name and count, the box behind that
+# count, and the distance between two bonuses. A lone bonus is moved
+# down by SINGLE_SET_OFFSET
+SET_NAME_CENTER = (770, 560)
+SET_COUNT_CENTER = (951, 560)
+SET_COUNT_BOX = (935, 548, 965, 569)
+SET_SPACING = 25
+SINGLE_SET_OFFSET = 12
+
+# Card regions (left, top, right, bottom), each cached as a separate
+# tile. Regions that outgrow their box are given a larger one, see
+# weapon_box, stats_box and header_box
+HEADER_BOX = (0, 0, 500, 160)
+CONSTELLATIONS_BOX = (0, 160, 130, 540)
+PLAYER_BOX = (0, 540, 430, 610)
+TALENTS_BOX = (430, 295, 540, 610)
+WEAPON_BOX = (500, 0, 1000, 178)
+STATS_BOX = (540, 178, 1000, 545)
+SETS_BOX = (540, 545, 1000, 610)
+ARTIFACT_BOXES = [
+    (1000, 7 + ARTIFACT_SPACING * index, 1463, 126 + ARTIFACT_SPACING * index)
+    for index in range(5)
+]
+
+
+def format_value(stat: Stat, thousands: bool = False) -> str:
+    value = "{:,}".format(stat.value) if thousands else f"{stat.value}"
+    return f"{value}{'%' if stat.percent else ''}"
+
+
+def header_box(card: CardData) -> Tuple[int, int, int, int]:
+    """Box of the header, widened for long names and nicknames."""
+
+    w = int(measure(f"{card.name}", 30))
+    w += measure(f"{card.player.nickname}", 16)
+
+    left, top, right, bottom = HEADER_BOX
+    return left, top, max(right, int(38 + w + 35) + 5), bottom
+
+
+def header_ops(card: CardData) -> List[Op]:
+    """Character name, player nickname, level and friendship."""
+
+    w = int(measure(f"{card.name}", 30))
+    level_w = int(measure(f"Lv. {card.level}/", 23))
 
-from prop_reference import RARITY_REFERENCE, SUBST_ORDER
-from utils import (fade_asset_icon, fade_character_art, format_statistics,
-                   get_active_artifact_sets, get_font, get_stat_filename,
-                   open_image, scale_image)
-
-
-def generate_image(
-    data: EnkaNetworkResponse, character: CharacterInfo, locale: Language = Language.EN
-):
-    """Create language-specific asset-getter"""
-    asset_reference = Assets(lang=locale)
-
-    """ COLORS """
-    GREEN = (150, 255, 169)
-    WHITE = (255, 255, 255)
-    LIGHTER_GREY = (255, 255, 255, 150)
-    BEIGE = (245, 222, 179)
-
-    """ BACKGROUND SETUP """
-    background = open_image("attributes/Assets/default_enka_card.png")
-
-    background_rgb = {
-        "Pyro": (186, 140, 131),
-        "Hydro": (132, 161, 198),
-        "Dendro": (45, 142, 52),
-        "Electro": (152, 118, 173),
-        "Anemo": (82, 176, 177),
-        "Cryo": (70, 168, 186),
-        "Geo": (187, 159, 75),
-    }.get(character.element.name, (255, 255, 255, 50))
-
-    background_color = Image.new("RGBA", background.size, background_rgb)
-    background = ImageChops.overlay(background_color, background)
-
-    foreground = Image.new("RGBA", background.size, (0, 0, 0, 0))
-    textground = Image.new("RGBA", background.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(textground)
-
-    """ FIRST TRIMESTER """
-    character_art = open_image(
-        path=f"attributes/Genshin/Gacha/{character.image.banner.filename}.png",
-        asset_url=character.image.banner.url,
-    )
-    character_art = scale_image(character_art, fixed_percent=90)
-    character_art = character_art.crop(
-        (615, 85, character_art.width, character_art.height)
-    )
-    character_art = fade_character_art(character_art)
-
-    foreground.paste(character_art, (0, 0), character_art)
-
-    character_shade = open_image("attributes/Assets/enka_character_shade.png")
-    foreground.paste(character_shade, (0, 0), character_shade)
-
-    w = int(draw.textlength(f"{character.name}", font=get_font("normal", 30)))
-    draw.text(
-        (38, 35),
-        f"{character.name}",
-        font=get_font("normal", 30),
-        fill=WHITE,
-        anchor="lt",
-    )
-
-    draw.polygon(
-        [
-            (38 + w + 15, 53),
-            (38 + w + 15 + 6, 53),
-            (38 + w + 15 + 3, 53 - 5),
-        ],
-        fill=(255, 255, 255, 200),
-    )
-
-    draw.text(
-        (38 + w + 35, 51),
-        f"{data.player.nickname}",
-        fill=(255, 255, 255, 200),
-        anchor="lm",
-        font=get_font("normal", 16),
-    )
-
-    info_gap = 220
+    friendship_icon = open_image("attributes/UI/COMPANIONSHIP.png")
+    friendship_icon = scale_image(friendship_icon, fixed_height=45)
 
-    draw.text(
-        (38, info_gap + 325),
-        f"UID: {data.uid}",
-        font=get_font("normal", 18),
-    )
+    x, y = HEADER_ORIGIN
+    level_y = y + 41
+
+    return [
+        Text(TEXTGROUND, (x, y), f"{card.name}", 30, WHITE, "lt"),
+        Polygon(
+            TEXTGROUND,
+            [
+                (x + w + 15, y + 18),
+                (x + w + 15 + 6, y + 18),
+                (x + w + 15 + 3, y + 18 - 5),
+            ],
+            (255, 255, 255, 200),
+        ),
+        Text(
+            TEXTGROUND,
+            (x + w + 35, y + 16),
+            f"{card.player.nickname}",
+            16,
+            (255, 255, 255, 200),
+            "lm",
+        ),
+        Text(TEXTGROUND, (x, level_y), f"Lv. {card.level}/", 23),
+        Text(
+            TEXTGROUND,
+            (x + level_w, level_y),
+            f"{card.max_level}",
+            23,
+            LIGHTER_GREY,
+        ),
+        Paste(FOREGROUND, friendship_icon, (x - 4, y + 73)),
+        Text(TEXTGROUND, (x + 42, y + 95), f"{card.friendship_level}", 23, anchor="lm"),
+    ]
 
-    w = draw.textlength(f"WL{data.player.world_level}", font=get_font("normal", 18))
-    w2 = draw.textlength(f"AR{data.player.level}", font=get_font("normal", 18))
-    draw.text(
-        (38, info_gap + 350),
-        f"WL{data.player.world_level}",
-        font=get_font("normal", 18),
-    )
 
-    draw.rounded_rectangle(
-        (38 + w + 8, info_gap + 348, 38 + w + 8 + w2 + 10, info_gap + 372),
-        fill=(0, 0, 0, 125),
-        radius=3,
-    )
+def player_ops(player: Player) -> List[Op]:
+    """UID, world level and adventure rank."""
 
-    draw.text(
-        (38 + w + 8 + 5, info_gap + 350),
-        f"AR{data.player.level}",
-        font=get_font("normal", 18),
-        fill=BEIGE,
-    )
+    x, y = PLAYER_ORIGIN
+    line_y = y + PLAYER_LINE_SPACING
+    w = measure(f"WL{player.world_level}", 18)
+    w2 = measure(f"AR{player.level}", 18)
 
-    w = int(draw.textlength(f"Lv. {character.level}/", font=get_font("normal", 23)))
-    draw.text((38, 49 + 27), f"Lv. {character.level}/", font=get_font("normal", 23))
+    return [
+        Text(TEXTGROUND, (x, y), f"UID: {player.uid}", 18),
+        Text(TEXTGROUND, (x, line_y), f"WL{player.world_level}", 18),
+        Rect(
+            TEXTGROUND,
+            (x + w + 8, line_y - 2, x + w + 8 + w2 + 10, line_y + 22),
+            (0, 0, 0, 125),
+            3,
+        ),
+        Text(TEXTGROUND, (x + w + 8 + 5, line_y), f"AR{player.level}", 18, BEIGE),
+    ]
 
-    draw.text(
-        (38 + w, 49 + 27),
-        f"{character.max_level}",
-        fill=LIGHTER_GREY,
-        font=get_font("normal", 23),
-    )
 
-    friendship_icon = open_image("attributes/UI/COMPANIONSHIP.png")
-    friendship_icon = scale_image(friendship_icon, fixed_height=45)
-    foreground.paste(friendship_icon, (34, 108), friendship_icon)
-    draw.text(
-        (80, 130),
-        f"{character.friendship_level}",
-        font=get_font("normal", 23),
-        anchor="lm",
-    )
+@lru_cache(maxsize=None)
+def constellation_overlay(background_rgb: tuple) -> Image.Image:
+    """Constellation frame with its element-tinted ring."""
 
-    """ Constellations Section """
     c_overlay = open_image("attributes/Assets/enka_constellation_overlay.png")
-    c_overlay = scale_image(c_overlay, fixed_height=75)
+    c_overlay = scale_image(c_overlay, fixed_height=75).copy()
     ImageDraw.Draw(c_overlay).ellipse(
         (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=background_rgb, width=2
     )
+
+    return c_overlay
+
+
+def constellation_ops(card: CardData, stacked_sprites: bool = True) -> List[Op]:
+    c_overlay = constellation_overlay(get_background_rgb(card.element))
     lock = open_image("attributes/UI/LOCKED.png", resize=(20, 25))
 
-    constellation_starting_index = 160
-    for index, constellation in enumerate(character.constellations):
-        foreground.paste(
-            c_overlay, (25, constellation_starting_index + 60 * index), c_overlay
-        )
+    x, y = CONSTELLATION_ORIGIN
+    ops = []
+    for index, icon in enumerate(card.constellations):
+        top = y + CONSTELLATION_SPACING * index
+        ops.append(Paste(FOREGROUND, c_overlay, (x, top)))
+
         constellation_icon = open_image(
-            path=f"attributes/Genshin/UI/{constellation.icon.filename}.png",
-            asset_url=constellation.icon.url,
+            path=genshin_asset_path("UI", icon.filename),
+            asset_url=icon.url,
         )
         constellation_icon = scale_image(constellation_icon, fixed_height=45)
 
-        if index >= character.constellations_unlocked:
+        if index >= card.constellations_unlocked:
             f = ImageEnhance.Brightness(constellation_icon)
             constellation_icon = f.enhance(0.4)
             constellation_icon.paste(lock, (13, 8), lock)
+            times = 1
         else:
-            for _ in range(2):
-                foreground.paste(
-                    constellation_icon,
-                    (
-                        int(63 - (constellation_icon.size[0] / 2)),
-                        constellation_starting_index + 15 + 60 * index,
-                    ),
-                    constellation_icon,
-                )
-
-        foreground.paste(
-            constellation_icon,
-            (
-                int(63 - (constellation_icon.size[0] / 2)),
-                constellation_starting_index + 15 + 60 * index,
-            ),
-            constellation_icon,
+            times = 3
+
+        ops.append(
+            Paste(
+                FOREGROUND,
+                constellation_icon,
+                (int(x + 38 - (constellation_icon.size[0] / 2)), top + 15),
+                times,
+                stacked_sprites,
+            )
         )
 
-    """ Talents Section """
+    return ops
+
+
+def talent_ops(skills: Tuple[Skill, ...], stacked_sprites: bool = True) -> List[Op]:
     talent_overlay = open_image(f"attributes/Assets/enka_talent_overlay.png")
     talent_overlay = scale_image(talent_overlay, fixed_height=80)
 
-    for index, skill in enumerate(character.skills):
-        for _ in range(4):
-            foreground.paste(talent_overlay, (430, 305 + 90 * index), talent_overlay)
-
+    x, y = TALENT_ORIGIN
+    center = x + 41
+    ops = []
+    for index, skill in enumerate(skills):
+        top = y + TALENT_SPACING * index
         sk = open_image(
-            path=f"attributes/Genshin/UI/{skill.icon.filename}.png",
+            path=genshin_asset_path("UI", skill.icon.filename),
             asset_url=skill.icon.url,
             resize=(50, 50),
         )
+        w = int(measure(str(skill.level), 20))
 
-        for _ in range(3):
-            foreground.paste(sk, (int(471 - (sk.size[0] / 2)), 320 + 90 * index), sk)
+        ops += [
+            Paste(FOREGROUND, talent_overlay, (x, top), 4, stacked_sprites),
+            Paste(
+                FOREGROUND,
+                sk,
+                (int(center - (sk.size[0] / 2)), top + 15),
+                3,
+                stacked_sprites,
+            ),
+            Rect(
+                FOREGROUND,
+                (center - w / 2 - 6, top + 77 - 15, center + w / 2 + 6, top + 77 + 15),
+                (50, 50, 50, 178) if not skill.is_boosted else (79, 188, 212),
+                15,
+            ),
+            Text(FOREGROUND, (center + 1, top + 78), f"{skill.level}", 20, anchor="mm"),
+        ]
 
-        w = int(draw.textlength(str(skill.level), font=get_font("normal", 20)))
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (
-                471 - w / 2 - 6,
-                382 + 90 * index - 15,
-                471 + w / 2 + 6,
-                382 + 90 * index + 15,
+    return ops
+
+
+def weapon_box(weapon: Weapon) -> Tuple[int, int, int, int]:
+    """Box of the weapon block, long names push its details down."""
+
+    if measure(f"{weapon.name}", 22) < 295:
+        return WEAPON_BOX
+
+    lines = len(textwrap.wrap(f"{weapon.name}", width=20))
+    left, top, right, bottom = WEAPON_BOX
+    return left, top, right, max(bottom, 140 + 28 * (lines - 1))
+
+
+def weapon_information_ops(
+    weapon: Weapon, line_buffer: int = 0, stacked_sprites: bool = True
+) -> List[Op]:
+    """Main stat, bonus stat, refinement and level of the weapon."""
+
+    x = WEAPON_INFO_X
+    top = 60 + line_buffer
+    ops = []
+
+    # Weapon Main Stat
+    mainstat = weapon.mainstat
+    w = int(measure(format_value(mainstat), 22))
+    endpoint = x + 20 + 35 + w
+
+    ops += [
+        Rect(FOREGROUND, (x, top, endpoint, top + 35), (235, 235, 235, 40), 4),
+        Paste(
+            TEXTGROUND,
+            get_stat_icon(mainstat.prop_id),
+            (x + 5, top + 3),
+            3,
+            stacked_sprites,
+        ),
+        Text(TEXTGROUND, (x + 45, top + 5), format_value(mainstat), 22, anchor="la"),
+    ]
+
+    # Weapon Bonus
+    substat = weapon.substat
+    if substat:
+        w = int(measure(format_value(substat), 22))
+
+        ops += [
+            Rect(
+                FOREGROUND,
+                (endpoint + 10, top, endpoint + 10 + 20 + 35 + w, top + 35),
+                (235, 235, 235, 40),
+                4,
             ),
-            radius=15,
-            fill=(50, 50, 50, 178) if not skill.is_boosted else (79, 188, 212),
-        )
+            Paste(
+                TEXTGROUND,
+                get_stat_icon(substat.prop_id),
+                (int(endpoint + 15), top + 3),
+                3,
+                stacked_sprites,
+            ),
+            Text(
+                TEXTGROUND,
+                (endpoint + 55, top + 5),
+                format_value(substat),
+                22,
+                anchor="la",
+            ),
+        ]
+
+    w = int(measure(f"R{weapon.refinement}", 22))
+    endpoint = x + 20 + w
+    level_w = int(measure(f"Lv. {weapon.level}/{weapon.max_level}", 22))
+    max_level_x = endpoint + 20 + int(measure(f"Lv. {weapon.level}/", 22))
+
+    ops += [
+        Rect(FOREGROUND, (x, top + 45, endpoint, top + 75), (0, 0, 0, 100), 4),
+        Text(
+            TEXTGROUND,
+            (x + 10, top + 45 + 2),
+            f"R{weapon.refinement}",
+            22,
+            (245, 222, 179),
+        ),
+        Rect(
+            FOREGROUND,
+            (endpoint + 10, top + 45, endpoint + 30 + level_w, top + 75),
+            (0, 0, 0, 100),
+            4,
+        ),
+        Text(TEXTGROUND, (endpoint + 20, top + 45 + 2), f"Lv. {weapon.level}/", 22),
+        Text(
+            TEXTGROUND,
+            (max_level_x, top + 45 + 2),
+            f"{weapon.max_level}",
+            22,
+            (255, 255, 255, 150),
+        ),
+    ]
+
+    return ops
 
-        ImageDraw.Draw(foreground, "RGBA").text(
-            (472, 383 + 90 * index),
-            f"{skill.level}",
-            font=get_font("normal", 20),
-            anchor="mm",
-        )
 
-    weapon = character.equipments[-1]
+def weapon_ops(weapon: Weapon, stacked_sprites: bool = True) -> List[Op]:
     weapon_image = open_image(
-        path=f"attributes/Genshin/Weapon/{weapon.detail.icon.filename}.png",
-        asset_url=weapon.detail.icon.url,
+        path=genshin_asset_path("Weapon", weapon.icon.filename),
+        asset_url=weapon.icon.url,
     )
     weapon_image = scale_image(weapon_image, fixed_height=125)
 
-    foreground.paste(weapon_image, (555, 25), weapon_image)
-
+    rarity_name = RARITY_REFERENCE[str(weapon.rarity)]
     rarity_light = scale_image(
-        open_image(
-            f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}_WEAPON_LIGHT.png"
-        ),
-        fixed_height=40,
-    )
-    foreground.paste(
-        rarity_light, (int(625 - (rarity_light.size[0] / 2)), 130), rarity_light
+        open_image(f"attributes/UI/{rarity_name}_WEAPON_LIGHT.png"), fixed_height=40
     )
+    rarity = scale_image(open_image(f"attributes/UI/{rarity_name}.png"), fixed_height=25)
+    dark_shadow = brighten(rarity, 0)
+
+    x, y = WEAPON_ORIGIN
+    center = x + 70
+    ops = [
+        Paste(FOREGROUND, weapon_image, (x, y)),
+        Paste(
+            FOREGROUND,
+            rarity_light,
+            (int(center - (rarity_light.size[0] / 2)), y + 105),
+        ),
+        Paste(
+            FOREGROUND, dark_shadow, (int(center - (rarity.size[0] / 2)), y + 110 + 2)
+        ),
+        Paste(FOREGROUND, rarity, (int(center - (rarity.size[0] / 2)), y + 110)),
+    ]
 
-    rarity = scale_image(
-        open_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
-        fixed_height=25,
-    )
+    if measure(f"{weapon.name}", 22) < 295:
+        ops.append(
+            Text(TEXTGROUND, (WEAPON_INFO_X, 32), f"{weapon.name}", 22, anchor="lt")
+        )
+        line_buffer = 5
+    else:
+        weapon_name = textwrap.wrap(f"{weapon.name}", width=20)
 
-    dark_shadow = ImageEnhance.Brightness(rarity).enhance(0)
-    foreground.paste(
-        dark_shadow, (int(625 - (rarity.size[0] / 2)), 135 + 2), dark_shadow
-    )
-    foreground.paste(rarity, (int(625 - (rarity.size[0] / 2)), 135), rarity)
+        for index, line in enumerate(weapon_name):
+            ops.append(
+                Text(TEXTGROUND, (WEAPON_INFO_X, 32 + (index * 25)), line, 22, anchor="lt")
+            )
 
-    weapon_length = int(
-        draw.textlength(f"{weapon.detail.name}", font=get_font("normal", 22))
-    )
+        line_buffer = 28 * index
 
-    def draw_weapon_information(line_buffer: int = 0):
-        # Weapon Main Stat
-        mainstat = weapon.detail.mainstats
-        w = int(
-            draw.textlength(
-                f"{mainstat.value}{'%' if mainstat.type == DigitType.PERCENT else ''}",
-                font=get_font("normal", 22),
-            )
-        )
+    return ops + weapon_information_ops(weapon, line_buffer, stacked_sprites)
 
-        endpoint = 690 + 20 + 35 + w
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (690, 60 + line_buffer, endpoint, 95 + line_buffer),
-            fill=(235, 235, 235, 40),
-            radius=4,
-        )
+def stats_box(all_stats: Tuple[StatRow, ...]) -> Tuple[int, int, int, int]:
+    """Box of the statistics list, which outgrows its space
+    when there are more than eight rows."""
 
-        image = open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
-        icon_file = scale_image(image, fixed_height=30)
-        icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
+    statistic_buffer = STATS_HEIGHT // len(all_stats)
+    left, top, right, bottom = STATS_BOX
+    return left, top, right, max(bottom, 215 + statistic_buffer * (len(all_stats) - 1))
 
-        for _ in range(3):
-            textground.paste(icon_file, (695, 63 + line_buffer), icon_file)
 
-        draw.text(
-            (735, 65 + line_buffer),
-            f"{mainstat.value}{'%' if mainstat.type == DigitType.PERCENT else ''}",
-            font=get_font("normal", 22),
-            anchor="la",
-        )
+def stats_ops(
+    all_stats: Tuple[StatRow, ...],
+    locale: Language = Language.EN,
+    stacked_sprites: bool = True,
+) -> List[Op]:
+    """Stat rows, named from the preloaded locale tables."""
 
-        # Weapon Bonus
-        substat = weapon.detail.substats
-        if substat:
-            substat = substat[0]
+    x, y = STATS_ORIGIN
+    statistic_buffer = STATS_HEIGHT // len(all_stats)
+    ops = []
+    for index, row in enumerate(all_stats):
+        top = y + (index * statistic_buffer)
 
-            w = int(
-                draw.textlength(
-                    f"{substat.value}{'%' if substat.type == DigitType.PERCENT else ''}",
-                    font=get_font("normal", 22),
-                )
-            )
+        """ Draw Icon for Stat, Write Stat Name """
+        ops += [
+            Paste(FOREGROUND, get_stat_icon(row.prop_id), (x, top), 3, stacked_sprites),
+            Text(TEXTGROUND, (x + 48, top + 3), stat_name(row.prop_id, locale), 20),
+        ]
 
-            ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-                (
-                    endpoint + 10,
-                    60 + line_buffer,
-                    endpoint + 10 + 20 + 35 + w,
-                    95 + line_buffer,
+        """ Write Stat Info """
+        if row.base is not None:
+            # HP, ATK and DEF, with their base and bonus parts underneath
+            w = measure(f"+{row.bonus}", 12)
+            ops += [
+                Text(
+                    TEXTGROUND,
+                    (STAT_VALUE_X, top + 3 - 10),
+                    row.text,
+                    20,
+                    anchor="ra",
+                ),
+                Text(
+                    TEXTGROUND,
+                    (STAT_VALUE_X, top + 3 + 12),
+                    f"+{row.bonus}",
+                    12,
+                    (150, 255, 169, 200),
+                    "ra",
+                ),
+                Text(
+                    TEXTGROUND,
+                    (STAT_VALUE_X - w - 5, top + 3 + 12),
+                    row.base,
+                    12,
+                    (255, 255, 255, 200),
+                    "ra",
                 ),
-                fill=(235, 235, 235, 40),
-                radius=4,
+            ]
+        else:
+            ops.append(
+                Text(
+                    TEXTGROUND,
+                    (STAT_VALUE_X, top + 3),
+                    row.text,
+                    20,
+                    anchor="ra",
+                )
             )
 
-            image = open_image(
-                f"attributes/UI/{get_stat_filename(substat.prop_id)}.png"
-            )
-            icon_file = scale_image(image, fixed_height=30)
-            icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
+    return ops
 
-            for _ in range(3):
-                textground.paste(
-                    icon_file, (int(endpoint + 15), 63 + line_buffer), icon_file
-                )
 
-            draw.text(
-                (endpoint + 55, 65 + line_buffer),
-                f"{substat.value}{'%' if substat.type == DigitType.PERCENT else ''}",
-                font=get_font("normal", 22),
-                anchor="la",
-            )
+def artifact_ops(
+    artifact: Optional[Artifact], artif_index: int, stacked_sprites: bool = True
+) -> List[Op]:
+    """Artifact panel in slot `artif_index`, dimmed when empty."""
 
-        w = int(
-            draw.textlength(
-                f"R{weapon.refinement}",
-                font=get_font("normal", 22),
-            )
-        )
+    x = ARTIFACT_ORIGIN[0]
+    y = ARTIFACT_ORIGIN[1] + ARTIFACT_SPACING * artif_index
+    width, height = ARTIFACT_PANEL_SIZE
 
-        endpoint = 690 + 20 + w
+    panel = Rect(
+        FOREGROUND,
+        (x, y, x + width, y + height),
+        (0, 0, 0, 60) if artifact else (0, 0, 0, 25),
+        5,
+    )
+    if not artifact:
+        return [panel]
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (690, 60 + 45 + line_buffer, endpoint, 95 + 40 + line_buffer),
-            fill=(0, 0, 0, 100),
-            radius=4,
-        )
+    artif_icon = fade_asset_icon(
+        open_image(
+            path=genshin_asset_path("Artifact", artifact.icon.filename),
+            asset_url=artifact.icon.url,
+            resize=(190, 190),
+        ),
+        "artifact",
+    )
+    artif_icon = artif_icon.crop((40, 40, 146, 146))
 
-        draw.text(
-            (690 + 10, 60 + 45 + 2 + line_buffer),
-            f"R{weapon.refinement}",
-            font=get_font("normal", 22),
-            fill=(245, 222, 179),
-        )
+    rarity = scale_image(
+        open_image(f"attributes/UI/{RARITY_REFERENCE[str(artifact.rarity)]}.png"),
+        fixed_height=18,
+    )
+    dark_shadow = brighten(rarity, 0)
+
+    level_w = measure(f"+{artifact.level}", 12)
+    ops = [
+        panel,
+        Paste(FOREGROUND, artif_icon, (x, y)),
+        Line(
+            TEXTGROUND,
+            (x + 166, y + 10, x + 166, y + height - 10),
+            (255, 255, 255, 25),
+            2,
+        ),
+        Paste(
+            FOREGROUND,
+            get_stat_icon(artifact.mainstat.prop_id),
+            (x + 116, y + 11),
+            3,
+            stacked_sprites,
+        ),
+        Text(
+            TEXTGROUND,
+            (x + 141, y + 46),
+            format_value(artifact.mainstat, thousands=True),
+            27,
+            WHITE,
+            "rt",
+        ),
+        Rect(
+            FOREGROUND,
+            (x + 141 - level_w - 8, y + 76, x + 141, y + 92),
+            (0, 0, 0, 175),
+            3,
+        ),
+        Text(TEXTGROUND, (x + 139, y + 78), f"+{artifact.level}", 14, WHITE, "rt"),
+        Paste(TEXTGROUND, dark_shadow, (x + 26, y + 76)),
+        Paste(TEXTGROUND, rarity, (x + 26, y + 74)),
+    ]
 
-        w = int(
-            draw.textlength(
-                f"Lv. {weapon.level}/{weapon.max_level}",
-                font=get_font("normal", 22),
-            )
-        )
+    """ Artifact Substats """
+    for index, subst in enumerate(artifact.substats):
+        row, column = {0: [0, 0], 1: [1, 0], 2: [0, 1], 3: [1, 1]}.get(index)
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (
-                endpoint + 10,
-                60 + 45 + line_buffer,
-                endpoint + 30 + w,
-                95 + 40 + line_buffer,
+        ops += [
+            Paste(
+                FOREGROUND,
+                get_stat_icon(subst.prop_id),
+                (x + 181 + 125 * column, y + 16 + 45 * row),
             ),
-            fill=(0, 0, 0, 100),
-            radius=4,
-        )
-
-        w = int(
-            draw.textlength(
-                f"Lv. {weapon.level}/",
-                font=get_font("normal", 22),
-            )
-        )
+            Text(
+                TEXTGROUND,
+                (x + 211 + 125 * column, y + 18 + 45 * row),
+                f" +{format_value(subst, thousands=True)}",
+                20,
+                WHITE,
+            ),
+        ]
 
-        draw.text(
-            (endpoint + 20, 60 + 45 + 2 + line_buffer),
-            f"Lv. {weapon.level}/",
-            font=get_font("normal", 22),
-        )
+    return ops
 
-        draw.text(
-            (endpoint + 20 + w, 60 + 45 + 2 + line_buffer),
-            f"{weapon.max_level}",
-            font=get_font("normal", 22),
-            fill=(255, 255, 255, 150),
-        )
 
-        return
+@lru_cache(maxsize=None)
+def sets_frame_ops() -> Tuple[Op, ...]:
+    """Static part of the set bonus footer, the same on every card."""
 
-    if weapon_length < 295:
-        draw.text(
-            (690, 32), f"{weapon.detail.name}", font=get_font("normal", 22), anchor="lt"
-        )
+    x, y = SETS_ORIGIN
+    flower_of_life = open_image(
+        "attributes/Assets/flower_of_life_icon.png", resize=(35, 35)
+    )
 
-        draw_weapon_information(line_buffer=5)
-    else:
-        weapon_name = textwrap.wrap(f"{weapon.detail.name}", width=20)
+    return (
+        Rect(FOREGROUND, (x, y, x + 48, y + 48), (0, 0, 0, 50), 5),
+        Paste(FOREGROUND, flower_of_life, (x + 7, y + 8)),
+    )
 
-        for index, line in enumerate(weapon_name):
-            draw.text(
-                (690, 32 + (index * 25)), line, font=get_font("normal", 22), anchor="lt"
-            )
 
-        draw_weapon_information(line_buffer=28 * index)
+def set_bonus_ops(
+    name: str, count: str, offset: int, count_offset: int = 0
+) -> List[Op]:
+    """Name and count of one set bonus, `offset` below the first."""
 
-    all_stats = format_statistics(character)
-    statistic_buffer = 365 // len(all_stats)
-    for index, item in enumerate(all_stats):
-        """Draw Icon for Stat"""
-        image = open_image(f"attributes/UI/{get_stat_filename(item)}.png")
-        icon_file = scale_image(image, fixed_height=30)
-        icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
+    left, top, right, bottom = SET_COUNT_BOX
+    name_x, name_y = SET_NAME_CENTER
+    count_x, count_y = SET_COUNT_CENTER
 
-        for _ in range(3):
-            foreground.paste(
-                icon_file, (555, 180 + (index * statistic_buffer)), icon_file
-            )
+    return [
+        Text(TEXTGROUND, (name_x, name_y + offset), name, 17, GREEN, "mm"),
+        Rect(
+            FOREGROUND, (left, top + offset, right, bottom + offset), (0, 0, 0, 50), 3
+        ),
+        Text(
+            TEXTGROUND,
+            (count_x, count_y + offset + count_offset),
+            count,
+            17,
+            WHITE,
+            "mm",
+        ),
+    ]
 
-        """ Write Stat Name """
-        draw.text(
-            (603, 183 + (index * statistic_buffer)),
-            asset_reference.get_hash_map(item),
-            font=get_font("normal", 20),
-        )
 
-        """ Write Stat Info """
-        if item in ["FIGHT_PROP_HP", "FIGHT_PROP_ATTACK", "FIGHT_PROP_DEFENSE"]:
-            pattern = r"([\d,]+)\s*\(([\d,]+)\s*\+\s*([\d,]+)\)"
-            match = re.match(pattern, all_stats[item])
-            stat_values = [match.group(1), match.group(2), match.group(3)]
-
-            draw.text(
-                (967, 183 - 10 + (index * statistic_buffer)),
-                stat_values[0],
-                font=get_font("normal", 20),
-                anchor="ra",
-            )
+def sets_ops(active_sets: Tuple[SetBonus, ...]) -> List[Op]:
+    """Flower icon and the activated set bonuses."""
 
-            w = draw.textlength(f"+{stat_values[2]}", font=get_font("normal", 12))
-            draw.text(
-                (967, 183 + 12 + (index * statistic_buffer)),
-                f"+{stat_values[2]}",
-                font=get_font("normal", 12),
-                anchor="ra",
-                fill=(150, 255, 169, 200),
-            )
+    ops = list(sets_frame_ops())
 
-            draw.text(
-                (967 - w - 5, 183 + 12 + (index * statistic_buffer)),
-                f"{stat_values[1]}",
-                font=get_font("normal", 12),
-                anchor="ra",
-                fill=(255, 255, 255, 200),
+    """ Activated Sets Section """
+    if len(active_sets) > 1:
+        """Two Activated Sets"""
+        for set_index, artifact_set in enumerate(active_sets):
+            ops += set_bonus_ops(
+                f"{artifact_set.name}", f"{artifact_set.count}", SET_SPACING * set_index
             )
+    else:
+        if active_sets:
+            """Single Activated Set"""
+            name, count = active_sets[0].name, str(active_sets[0].count)
         else:
-            draw.text(
-                (967, 183 + (index * statistic_buffer)),
-                str(all_stats[item]),
-                font=get_font("normal", 20),
-                anchor="ra",
-            )
+            """No Activated Sets"""
+            # Feel free to remove or manually localize this string
+            name, count = "No Activated Bonuses", "0"
 
-    positions = [
-        "EQUIP_BRACER",
-        "EQUIP_NECKLACE",
-        "EQUIP_SHOES",
-        "EQUIP_RING",
-        "EQUIP_DRESS",
-    ]
+        # A lone count sits a pixel higher than its name
+        ops += set_bonus_ops(name, count, SINGLE_SET_OFFSET, count_offset=-1)
 
-    artifact_spacer = 119
-    for artif_index, equipment_type in enumerate(positions):
-        artifact = next(filter(
-            lambda x: (
-                x.type == EquipmentsType.ARTIFACT and 
-                x.detail.artifact_type.value == equipment_type
-            ), 
-            character.equipments
-        ), None)
-
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (
-                1009,
-                14 + artifact_spacer * artif_index,
-                1009 + 440,
-                14 + 105 + artifact_spacer * artif_index,
-            ),
-            fill=(0, 0, 0, 60) if artifact else (0, 0, 0, 25),
-            radius=5,
-        )
+    return ops
 
-        if not artifact:
-            continue
 
-        artif_icon = fade_asset_icon(
-            open_image(
-                path=f"attributes/Genshin/Artifact/{artifact.detail.icon.filename}.png",
-                asset_url=artifact.detail.icon.url,
-                resize=(190, 190),
-            ),
-            "artifact",
-        )
-        artif_icon = artif_icon.crop((40, 40, 146, 146))
-        foreground.paste(
-            artif_icon, (1009, 14 + artifact_spacer * artif_index), artif_icon
-        )
+def draw_card(
+    card: CardData,
+    locale: Language = Language.EN,
+    stacked_sprites: bool = True,
+    cache: bool = True,
+) -> Image.Image:
+    """Render the card of `card` in memory, see render_image.
 
-        draw.line(
-            (
-                1175,
-                14 + 10 + artifact_spacer * artif_index,
-                1175,
-                14 + 105 - 10 + artifact_spacer * artif_index,
-            ),
-            fill=(255, 255, 255, 25),
-            width=2,
-        )
+    Each region of the card is drawn to its own tile, cached on just
+    the part of `card` it shows (see tiles.py), so a card where only
+    one artifact changed redraws that panel alone. `cache` off draws
+    every region."""
 
-        image = open_image(
-            f"attributes/UI/{get_stat_filename(artifact.detail.mainstats.prop_id)}.png"
-        )
-        icon_file = scale_image(image, fixed_height=30)
-        icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
+    base_key = (card.element, card.banner.filename, mask_version(), stacked_sprites)
 
-        for _ in range(3):
-            foreground.paste(
-                icon_file, (1125, 25 + artifact_spacer * artif_index), icon_file
-            )
-
-        mainstat = artifact.detail.mainstats
-        draw.text(
-            (1150, 60 + artifact_spacer * artif_index),
-            f"{('{:,}'.format(mainstat.value))}{'%' if mainstat.type == DigitType.PERCENT else ''}",
-            anchor="rt",
-            font=get_font("normal", 27),
-            fill=WHITE,
-        )
-
-        w = draw.textlength(f"+{artifact.level}", font=get_font("normal", 12))
-
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+    regions = [
+        Region(
+            "header",
+            header_box(card),
             (
-                1150 - w - 8,
-                60 + 30 + artifact_spacer * artif_index,
-                1150,
-                60 + 31 + 15 + artifact_spacer * artif_index,
-            ),
-            fill=(0, 0, 0, 175),
-            radius=3,
-        )
-
-        draw.text(
-            (1150 - 2, 60 + 32 + artifact_spacer * artif_index),
-            f"+{artifact.level}",
-            anchor="rt",
-            font=get_font("normal", 14),
-            fill=WHITE,
-        )
-
-        rarity = scale_image(
-            open_image(
-                f"attributes/UI/{RARITY_REFERENCE[str(artifact.detail.rarity)]}.png"
+                card.name,
+                card.player.nickname,
+                card.level,
+                card.max_level,
+                card.friendship_level,
             ),
-            fixed_height=18,
-        )
+            drawer(header_ops, card),
+        ),
+        Region("player", PLAYER_BOX, card.player, drawer(player_ops, card.player)),
+        Region(
+            "constellations",
+            CONSTELLATIONS_BOX,
+            (card.constellations, card.constellations_unlocked),
+            drawer(constellation_ops, card, stacked_sprites),
+        ),
+        Region(
+            "talents",
+            TALENTS_BOX,
+            card.skills,
+            drawer(talent_ops, card.skills, stacked_sprites),
+        ),
+        Region(
+            "weapon",
+            weapon_box(card.weapon),
+            card.weapon,
+            drawer(weapon_ops, card.weapon, stacked_sprites),
+        ),
+        Region(
+            "stats",
+            stats_box(card.stats),
+            (card.stats, locale.value),
+            drawer(stats_ops, card.stats, locale, stacked_sprites),
+        ),
+    ]
 
-        dark_shadow = ImageEnhance.Brightness(rarity).enhance(0)
-        textground.paste(
-            dark_shadow, (1035, 90 + artifact_spacer * artif_index), dark_shadow
+    for index, artifact in enumerate(card.artifacts):
+        regions.append(
+            Region(
+                f"artifacts-{index}",
+                ARTIFACT_BOXES[index],
+                artifact,
+                drawer(artifact_ops, artifact, index, stacked_sprites),
+            )
         )
 
-        textground.paste(rarity, (1035, 88 + artifact_spacer * artif_index), rarity)
-
-        """ Artifact Substats """
-        artifact.detail.substats.sort(key=lambda x: SUBST_ORDER.index(x.prop_id))
-        for index, subst in enumerate(artifact.detail.substats):
-            """Draw Icon for Subtat"""
-
-            position = {0: [0, 0], 1: [1, 0], 2: [0, 1], 3: [1, 1]}.get(index)
-
-            image = open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
-            icon_file = scale_image(image, fixed_height=30)
-            icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
-
-            foreground.paste(
-                icon_file,
-                (
-                    1190 + 125 * position[1],
-                    30 + artifact_spacer * artif_index + 45 * position[0],
-                ),
-                icon_file,
-            )
+    regions.append(Region("sets", SETS_BOX, card.sets, drawer(sets_ops, card.sets)))
+
+    with metrics.phase("background"):
+        background = get_background(card.element)
+    with metrics.phase("banner"):
+        character_layer = get_character_layer(card.banner, background.size)
+
+    return compose_card(base_key, background, character_layer, regions, cache=cache)
+
+
+def render_image(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    stacked_sprites: bool = True,
+    cache: bool = True,
+) -> Image.Image:
+    """Render an Enka.Network card for `character` in memory.
+
+    `stacked_sprites` pastes icons that are layered several times
+    over themselves in a single precomposited pass (see sprites.py),
+    turn it off to fall back to the repeated pastes. `cache` off
+    draws every region of the card, see draw_card.
+
+    The models are only read, once, into a CardData."""
+
+    card = CardData.from_api(data, character)
+    return draw_card(card, locale, stacked_sprites, cache)
+
+
+def card_cache_key(
+    card: CardData,
+    locale: Language,
+    format: ImageFormat,
+    compress_level: int,
+    quality: int,
+    stacked_sprites: bool,
+    encode_options: dict,
+) -> str:
+    """card_cache key of the encoded card, shared by encode_card
+    and render_card so both look up the same entry."""
+
+    return card_fingerprint(
+        card,
+        locale,
+        format,
+        compress_level,
+        quality,
+        stacked_sprites,
+        *sorted(encode_options.items()),
+    )
 
-            """ Draw Substat Value """
-            draw.text(
-                (
-                    1220 + 125 * position[1],
-                    32 + artifact_spacer * artif_index + 45 * position[0],
-                ),
-                f" +{('{:,}'.format(subst.value))}{'%' if subst.type == DigitType.PERCENT else ''}",
-                fill=WHITE,
-                font=get_font("normal", 20),
-            )
 
-    ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-        (555, 547, 555 + 48, 547 + 48), fill=(0, 0, 0, 50), radius=5
+def encode_card(
+    card: CardData,
+    locale: Language = Language.EN,
+    format: ImageFormat = "png",
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    stacked_sprites: bool = True,
+    cache: bool = True,
+    **encode_options,
+) -> bytes:
+    """Render and encode the card of `card`, see render_bytes. Takes
+    the extracted CardData, which is cheap to send to a process pool."""
+
+    def render() -> bytes:
+        image = draw_card(card, locale, stacked_sprites)
+        return encode_image(image, format, compress_level, quality, **encode_options)
+
+    if not cache:
+        return render()
+
+    key = card_cache_key(
+        card, locale, format, compress_level, quality, stacked_sprites, encode_options
     )
-
-    flower_of_life = open_image(
-        "attributes/Assets/flower_of_life_icon.png", resize=(35, 35)
+    return card_cache.get_or_create(key, render)
+
+
+def render_bytes(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    format: ImageFormat = "png",
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    stacked_sprites: bool = True,
+    cache: bool = True,
+    **encode_options,
+) -> bytes:
+    """Render a card and encode it, ready to be sent without
+    touching the disk. `encode_options` (lossless, strategy, colors,
+    rgb) are passed on to encoder.encode_image.
+
+    With `cache`, identical requests (same card_fingerprint) are
+    served from card_cache instead of being rendered again."""
+
+    return encode_card(
+        CardData.from_api(data, character),
+        locale,
+        format,
+        compress_level,
+        quality,
+        stacked_sprites,
+        cache,
+        **encode_options,
     )
-    foreground.paste(flower_of_life, (562, 555), flower_of_life)
 
-    """ Activated Sets Section """
-    active_sets = get_active_artifact_sets(character.equipments)
-    if len(active_sets) > 1:
-        """Two Activated Sets"""
-        for set_index, artifact_set in enumerate(active_sets):
-            draw.text(
-                (770, 560 + 25 * set_index),
-                f"{artifact_set.name}",
-                fill=GREEN,
-                anchor="mm",
-                font=get_font("normal", 17),
-            )
 
-            ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-                (935, 548 + 25 * set_index, 935 + 30, 548 + 21 + 25 * set_index),
-                fill=(0, 0, 0, 50),
-                radius=3,
-            )
-
-            draw.text(
-                (951, 560 + 25 * set_index),
-                f"{artifact_set.count}",
-                fill=WHITE,
-                anchor="mm",
-                font=get_font("normal", 17),
-            )
-
-            set_index += 1
-    elif len(active_sets) == 1:
-        """Single Activated Set"""
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (935, 548 + 12, 935 + 30, 548 + 21 + 12),
-            fill=(0, 0, 0, 50),
-            radius=3,
-        )
+async def render_card(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    format: ImageFormat = "png",
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    stacked_sprites: bool = True,
+    fetcher: Optional[AssetFetcher] = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+    **encode_options,
+) -> bytes:
+    """Render and encode a card without blocking the event loop,
+    `stacked_sprites` as for render_image and `encode_options` as
+    for render_bytes.
+
+    Missing assets are downloaded asynchronously through `fetcher`
+    (a temporary one when omitted), then the CPU-bound rendering runs
+    on `executor`, the loop's default executor if None. Only the
+    extracted CardData is passed to it, never the models. Cached
+    cards are returned right away. Raises asyncio.TimeoutError after
+    `timeout` seconds.
+
+    On cancellation or timeout a render that has not started yet is
+    dropped; one that is already running finishes in its worker and
+    its result is discarded.
+    """
 
-        draw.text(
-            (770, 572),
-            [set for set in active_sets][0].name,
-            fill=GREEN,
-            anchor="mm",
-            font=get_font("normal", 17),
-        )
+    card = CardData.from_api(data, character)
 
-        draw.text(
-            (951, 571),
-            str([set for set in active_sets][0].count),
-            fill=WHITE,
-            anchor="mm",
-            font=get_font("normal", 17),
-        )
-    else:
-        """No Activated Sets"""
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
-            (935, 548 + 12, 935 + 30, 548 + 21 + 12),
-            fill=(0, 0, 0, 50),
-            radius=3,
+    key = card_cache_key(
+        card, locale, format, compress_level, quality, stacked_sprites, encode_options
+    )
+    content = card_cache.get(key)
+    if content is not None:
+        return content
+
+    async def render() -> bytes:
+        assets = character_assets(character)
+        if fetcher is None:
+            async with AssetFetcher() as temporary:
+                await temporary.fetch_all(assets)
+        else:
+            await fetcher.fetch_all(assets)
+
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(
+            executor,
+            partial(
+                encode_card,
+                card,
+                locale,
+                format,
+                compress_level,
+                quality,
+                stacked_sprites,
+                cache=False,
+                **encode_options,
+            ),
         )
+        return card_cache.put(key, content)
 
-        # Feel free to remove or manually localize this string
-        draw.text(
-            (770, 572),
-            "No Activated Bonuses",
-            fill=GREEN,
-            anchor="mm",
-            font=get_font("normal", 17),
-        )
+    return await asyncio.wait_for(render(), timeout)
 
-        draw.text(
-            (951, 571),
-            "0",
-            fill=WHITE,
-            anchor="mm",
-            font=get_font("normal", 17),
-        )
 
-    if not os.path.exists("output"):
-        os.makedirs("output")
+def output_path(
+    character: CharacterInfo, format: ImageFormat = "png", output: str = "output"
+) -> str:
+    """Timestamped path generate_image saves the card of `character` to."""
 
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"{character.name}_{timestamp}"
-
-    foreground = Image.alpha_composite(foreground, textground)
-    Image.alpha_composite(background, foreground).save(
-        f"output/{filename}.png", format="png"
+    return os.path.join(
+        output, f"{character.name}_{timestamp}.{FILE_EXTENSIONS[format]}"
     )
 
-    """ 
-    If you're using an async environment, might be worth mentioning
-    that it is ideal to save the image into a BytesIO object and then
-    return that buffer object instead. This way, you can send
-    the image to the user without having to save it to the disk.
-    
-    Sample Example:
-        output = BytesIO() # <- Create a buffer object
-        Image.alpha_composite(background, foreground).save(output, format="png") # <- Save image to the buffer object "output"
-        output.seek(0) # <- Move the pointer to the beginning of the buffer object
-        
-        return output
-    """
 
-    return
+def generate_image(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    stacked_sprites: bool = True,
+    output: str = "output",
+    format: ImageFormat = "png",
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    **encode_options,
+) -> str:
+    """Render a card and save it to the `output` directory,
+    returns the path of the written file."""
+
+    content = render_bytes(
+        data,
+        character,
+        locale,
+        format,
+        compress_level,
+        quality,
+        stacked_sprites,
+        **encode_options,
+    )
+
+    return save_image(content, output_path(character, format, output))
@@ -0,0 +1,84 @@
+import math
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+from cache import LRUCache, image_nbytes
+from metrics import metrics
+from utils import get_font
+
+Color = Union[str, Tuple[int, int, int], Tuple[int, int, int, int]]
+
+# Rasterized text masks, a few thousand labels at card sizes
+TEXT_SPRITE_CACHE_BYTES = 8 * 1024 * 1024
+
+text_sprites = LRUCache(
+    max_bytes=TEXT_SPRITE_CACHE_BYTES, sizeof=lambda sprite: image_nbytes(sprite[0])
+)
+metrics.register_collector("text_sprite", text_sprites.stats)
+
+
+@lru_cache(maxsize=4096)
+def measure(text: str, size: int) -> float:
+    """Advance width of `text` in the card font."""
+    return get_font("normal", size).getlength(text)
+
+
+def text_sprite(
+    text: str,
+    size: int,
+    anchor: Optional[str] = None,
+    start: Tuple[float, float] = (0.0, 0.0),
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Rasterized alpha mask of a single line of text and its offset
+    from the anchor point, as ImageDraw.text would rasterize it.
+
+    `start` is the sub-pixel part of the position, glyphs are
+    rasterized differently at fractional coordinates. The colour is
+    not part of the sprite, so one sprite serves every fill.
+    """
+
+    key = (text, size, anchor, start)
+    sprite = text_sprites.get(key)
+    if sprite is None:
+        mask, offset = get_font("normal", size).getmask2(
+            text, "L", anchor=anchor, start=start
+        )
+        # Copy the font's core image into a regular one so it can be pasted
+        mask = Image.frombytes("L", mask.size, bytes(mask))
+        sprite = text_sprites.put(key, (mask, offset))
+
+    return sprite
+
+
+def draw_text(
+    image: Image.Image,
+    xy: Tuple[float, float],
+    text: str,
+    size: int,
+    fill: Optional[Color] = None,
+    anchor: Optional[str] = None,
+) -> None:
+    """Draw `text` onto `image` like ImageDraw.text, blitting a cached
+    sprite instead of rasterizing the glyphs again."""
+
+    if "\n" in text:
+        # Multiline layout (spacing, alignment) is left to ImageDraw
+        ImageDraw.Draw(image).text(
+            xy, text, font=get_font("normal", size), fill=fill, anchor=anchor
+        )
+        return
+
+    x, y = xy
+    mask, offset = text_sprite(text, size, anchor, (math.modf(x)[0], math.modf(y)[0]))
+    if not mask.width or not mask.height:
+        return
+
+    x = int(x) + offset[0]
+    y = int(y) + offset[1]
+
+    # Same blend as ImageDraw's bitmap fill, white when no fill is set
+    image.paste(
+        "white" if fill is None else fill, (x, y, x + mask.width, y + mask.height), mask
+    )
@@ -0,0 +1,87 @@
+import hashlib
+from functools import lru_cache
+from typing import Tuple
+
+from enkanetwork.model.utils import IconAsset
+from PIL import Image, ImageChops
+
+from cache import DerivedImageCache
+from prop_reference import BACKGROUND_REFERENCE, DEFAULT_BACKGROUND
+from utils import (CHARACTER_MASK, asset_cache, fade_character_art,
+                   genshin_asset_path, open_image, scale_image)
+
+# Faded character banners, set `banner_cache.directory` to
+# also keep them on disk between runs
+banner_cache = DerivedImageCache(max_bytes=128 * 1024 * 1024)
+
+
+def get_background_rgb(element: str) -> tuple:
+    """Card tint for an element name, e.g. "Pyro"."""
+    return BACKGROUND_REFERENCE.get(element, DEFAULT_BACKGROUND)
+
+
+@lru_cache(maxsize=None)
+def _tinted_background(rgb: tuple) -> Image.Image:
+    background = open_image("attributes/Assets/default_enka_card.png")
+    background_color = Image.new("RGBA", background.size, rgb)
+    return ImageChops.overlay(background_color, background)
+
+
+def get_background(element: str) -> Image.Image:
+    """Shared element-tinted background, copy it before drawing on it."""
+    return _tinted_background(get_background_rgb(element))
+
+
+def preload_backgrounds() -> None:
+    for rgb in [*BACKGROUND_REFERENCE.values(), DEFAULT_BACKGROUND]:
+        _tinted_background(rgb)
+
+
+@lru_cache(maxsize=None)
+def mask_version(path: str = CHARACTER_MASK) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def get_character_art(banner: IconAsset) -> Image.Image:
+    """Scaled, cropped and faded gacha banner for a character, cached
+    on the banner filename and the version of the fade mask."""
+
+    return banner_cache.get_or_create(
+        f"{banner.filename}-{mask_version()}", lambda: _fade_banner(banner)
+    )
+
+
+def get_character_layer(banner: IconAsset, size: Tuple[int, int]) -> Image.Image:
+    """Card-sized layer with the character art and the shade over it,
+    the base every region of the card is drawn on. Shared between
+    callers, copy it before drawing on it."""
+
+    key = ("character_layer", banner.filename, mask_version(), size)
+    return asset_cache.get_or_create(key, lambda: _character_layer(banner, size))
+
+
+def _character_layer(banner: IconAsset, size: Tuple[int, int]) -> Image.Image:
+    character_art = get_character_art(banner)
+    character_shade = open_image("attributes/Assets/enka_character_shade.png")
+
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    layer.paste(character_art, (0, 0), character_art)
+    layer.paste(character_shade, (0, 0), character_shade)
+
+    return layer
+
+
+def _fade_banner(banner: IconAsset) -> Image.Image:
+    # Only the faded result is worth keeping, skip the asset cache
+    character_art = open_image(
+        path=genshin_asset_path("Gacha", banner.filename),
+        asset_url=banner.url,
+        cache=False,
+    )
+    character_art = scale_image(character_art, fixed_percent=90)
+    character_art = character_art.crop(
+        (615, 85, character_art.width, character_art.height)
+    )
+
+    return fade_character_art(character_art, in_place=True)
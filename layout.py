@@ -0,0 +1,155 @@
+from typing import (Callable, Dict, Iterable, List, NamedTuple, Optional,
+                    Sequence, Tuple, Union)
+
+from PIL import Image, ImageDraw
+
+from glyphs import draw_text
+from sprites import paste_stacked
+
+# Layers a card is drawn on, composited background < foreground < textground
+FOREGROUND = "foreground"
+TEXTGROUND = "textground"
+
+Color = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
+Point = Tuple[float, float]
+
+
+class Text(NamedTuple):
+    layer: str
+    xy: Point
+    text: str
+    size: int
+    fill: Optional[Color] = None
+    anchor: Optional[str] = None
+
+
+class Rect(NamedTuple):
+    layer: str
+    box: Tuple[float, float, float, float]
+    fill: Color
+    radius: int = 0
+
+
+class Polygon(NamedTuple):
+    layer: str
+    points: Sequence[Point]
+    fill: Color
+
+
+class Line(NamedTuple):
+    layer: str
+    points: Tuple[float, float, float, float]
+    fill: Color
+    width: int = 1
+
+
+class Paste(NamedTuple):
+    layer: str
+    image: Image.Image
+    xy: Tuple[int, int]
+    # Pasted over itself this many times, see sprites.paste_stacked
+    times: int = 1
+    precomposite: bool = True
+
+
+Op = Union[Text, Rect, Polygon, Line, Paste]
+
+
+def _text(op: Text, image: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+    draw_text(image, op.xy, op.text, op.size, op.fill, op.anchor)
+
+
+def _rect(op: Rect, image: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+    draw.rounded_rectangle(op.box, fill=op.fill, radius=op.radius)
+
+
+def _polygon(op: Polygon, image: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+    draw.polygon(op.points, fill=op.fill)
+
+
+def _line(op: Line, image: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+    draw.line(op.points, fill=op.fill, width=op.width)
+
+
+def _paste(op: Paste, image: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+    paste_stacked(image, op.image, op.xy, op.times, op.precomposite)
+
+
+def _shift_text(op: Text, dx: int, dy: int) -> Text:
+    return op._replace(xy=(op.xy[0] + dx, op.xy[1] + dy))
+
+
+def _shift_rect(op: Rect, dx: int, dy: int) -> Rect:
+    x0, y0, x1, y1 = op.box
+    return op._replace(box=(x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+
+
+def _shift_polygon(op: Polygon, dx: int, dy: int) -> Polygon:
+    return op._replace(points=[(x + dx, y + dy) for x, y in op.points])
+
+
+def _shift_line(op: Line, dx: int, dy: int) -> Line:
+    x0, y0, x1, y1 = op.points
+    return op._replace(points=(x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+
+
+def _shift_paste(op: Paste, dx: int, dy: int) -> Paste:
+    return op._replace(xy=(op.xy[0] + dx, op.xy[1] + dy))
+
+
+_SHIFTS: Dict[type, Callable[[Op, int, int], Op]] = {
+    Text: _shift_text,
+    Rect: _shift_rect,
+    Polygon: _shift_polygon,
+    Line: _shift_line,
+    Paste: _shift_paste,
+}
+
+
+def translate(op: Op, dx: int, dy: int) -> Op:
+    """`op` moved by whole pixels, which rasterizes identically."""
+    return _SHIFTS[type(op)](op, dx, dy)
+
+
+_RUNNERS: Dict[type, Callable[[Op, Image.Image, ImageDraw.ImageDraw], None]] = {
+    Text: _text,
+    Rect: _rect,
+    Polygon: _polygon,
+    Line: _line,
+    Paste: _paste,
+}
+
+
+def execute(
+    ops: Iterable[Op],
+    foreground: Image.Image,
+    textground: Image.Image,
+    origin: Tuple[int, int] = (0, 0),
+) -> None:
+    """Run compiled draw operations against the card layers, with
+    one ImageDraw per layer for the whole list. `origin` is the card
+    position of the layers' top left corner, for layers that only
+    cover part of the card."""
+
+    images = {FOREGROUND: foreground, TEXTGROUND: textground}
+    draws = {name: ImageDraw.Draw(image) for name, image in images.items()}
+
+    dx, dy = -origin[0], -origin[1]
+    for op in ops:
+        if dx or dy:
+            op = translate(op, dx, dy)
+        _RUNNERS[type(op)](op, images[op.layer], draws[op.layer])
+
+
+def drawer(
+    compile: Callable[..., List[Op]], *args, **kwargs
+) -> Callable[[Image.Image, Image.Image, Tuple[int, int]], None]:
+    """Draw callback for a card region, which compiles the region's
+    operations only when the region actually has to be drawn."""
+
+    def draw(
+        foreground: Image.Image, textground: Image.Image, origin: Tuple[int, int]
+    ) -> None:
+        execute(compile(*args, **kwargs), foreground, textground, origin)
+
+    return draw
@@ -0,0 +1,87 @@
+import sys
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional
+
+from enkanetwork import Assets, Language
+
+from prop_reference import (BASE_STATS, ELEMENT_REFERENCE, RELIQUARY_STATS,
+                            SUBST_ORDER)
+
+# Every FIGHT_PROP_* a card can show a name for
+STAT_PROPS = tuple(
+    dict.fromkeys(
+        [*BASE_STATS, *RELIQUARY_STATS, *ELEMENT_REFERENCE, *SUBST_ORDER]
+    )
+)
+
+
+class LocaleRegistry:
+    """Process-wide table of stat names per language.
+
+    Each language's names are read from the enkanetwork text maps once
+    and kept as a read-only mapping, so renders look names up in a
+    dict instead of constructing Assets(lang=...) per card, which
+    reloads every data file and switches the language globally.
+    Build the tables before forking workers to share them.
+    """
+
+    def __init__(self, props: Iterable[str] = STAT_PROPS) -> None:
+        self.props = tuple(props)
+        self._tables: Dict[Language, Mapping[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, locale: Language = Language.EN) -> Mapping[str, str]:
+        table = self._tables.get(locale)
+        if table is not None:
+            return table
+
+        with self._lock:
+            table = self._tables.get(locale)
+            if table is None:
+                table = self._tables[locale] = self._build(locale)
+
+        return table
+
+    def _build(self, locale: Language) -> Mapping[str, str]:
+        if not Assets.HASH_MAP.get("fight_props"):
+            # Loads the text maps without touching the current language
+            Assets.reload_assets()
+
+        names = Assets.HASH_MAP["fight_props"]
+        lang = locale.value.upper()
+        return MappingProxyType(
+            {
+                prop: names[prop].get(lang) or names[prop]["EN"]
+                for prop in self.props
+                if prop in names
+            }
+        )
+
+    def stat_name(self, prop_id: str, locale: Language = Language.EN) -> str:
+        """Display name of `prop_id`, the id itself when unknown."""
+        return self.get(locale).get(prop_id, prop_id)
+
+    def preload(self, locales: Optional[Iterable[Language]] = None) -> None:
+        """Build the tables of `locales`, every language by default."""
+
+        for locale in locales or Language:
+            self.get(locale)
+
+    def footprint(self) -> Dict[str, int]:
+        """Approximate bytes held per loaded language, plus "total"."""
+
+        sizes = {}
+        for locale, table in self._tables.items():
+            sizes[locale.value] = sys.getsizeof(table.copy()) + sum(
+                sys.getsizeof(name) for name in table.values()
+            )
+        sizes["total"] = sum(sizes.values())
+        return sizes
+
+
+locale_registry = LocaleRegistry()
+
+
+def stat_name(prop_id: str, locale: Language = Language.EN) -> str:
+    return locale_registry.stat_name(prop_id, locale)
@@ -2,18 +2,29 @@ import asyncio
 
 from enkanetwork import EnkaNetworkAPI, Language
 
-from generator import generate_image
+from encoder import save_image
+from fetcher import AssetFetcher
+from fonts import font_registry
+from generator import output_path, preload_assets, render_card
 
 client = EnkaNetworkAPI(lang=Language.EN)
 uid = 604905943
 
 
 async def main():
-    async with client:
+    font_registry.warm()
+    preload_assets()
+
+    async with client, AssetFetcher() as fetcher:
         data = await client.fetch_user(uid)
+        await fetcher.prefetch(data.characters)
+
         for character in data.characters:
             print(f"[{uid}] Generating enka-card for {character.name}")
-            generate_image(data, character, client.lang)
+            content = await render_card(
+                data, character, client.lang, fetcher=fetcher, timeout=30
+            )
+            save_image(content, output_path(character))
 
 
 asyncio.run(main())
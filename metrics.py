@@ -0,0 +1,211 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Sequence
+
+# Histogram buckets in seconds, from sub-millisecond draws to downloads
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Counters in collector stats, everything else is exported as a gauge
+_COUNTER_KEYS = ("hits", "disk_hits", "misses", "evictions")
+
+Listener = Callable[[str, float], None]
+
+
+class _NullPhase:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # Per bucket, not cumulative; the last one is +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total, counts = 0, []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class Metrics:
+    """Optional timing and counters for card rendering.
+
+    Renders time their phases with `metrics.phase(name)` (background,
+    banner, the card regions, composite, encode, plus decode, fade and
+    download where they happen). Phases nest: a banner decoded on a
+    cache miss counts towards both decode and banner. Caches register
+    a stats() collector, read only when metrics are exported.
+
+    Disabled by default, which makes every hook a no-op. Once enabled,
+    each observation updates a histogram per phase and is passed to
+    the listeners; export with snapshot() or prometheus().
+    """
+
+    def __init__(
+        self, namespace: str = "enka_card", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.enabled = False
+        self.listeners: List[Listener] = []
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def add_listener(self, listener: Listener) -> None:
+        """Call `listener(phase, seconds)` for every timed phase."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        self.listeners.remove(listener)
+
+    def register_collector(
+        self, name: str, stats: Callable[[], Dict[str, float]]
+    ) -> None:
+        """Export `stats()` (hits, misses, ...) as cache `name`."""
+        self.collectors[name] = stats
+
+    def phase(self, name: str):
+        """Context manager timing the `name` phase."""
+        return _Phase(self, name) if self.enabled else _NULL_PHASE
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+        for listener in self.listeners:
+            listener(name, seconds)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            phases = {
+                name: {"count": h.count, "seconds": h.sum}
+                for name, h in self.histograms.items()
+            }
+            counters = dict(self.counters)
+
+        return {
+            "phases": phases,
+            "counters": counters,
+            "caches": {name: stats() for name, stats in self.collectors.items()},
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+
+        ns = self.namespace
+        lines = [f"# TYPE {ns}_phase_seconds histogram"]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                bounds = [*map(str, h.buckets), "+Inf"]
+                for bound, count in zip(bounds, h.cumulative()):
+                    lines.append(
+                        f'{ns}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} '
+                        f"{count}"
+                    )
+                lines.append(f'{ns}_phase_seconds_sum{{phase="{name}"}} {h.sum}')
+                lines.append(f'{ns}_phase_seconds_count{{phase="{name}"}} {h.count}')
+
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {ns}_{name}_total counter")
+                lines.append(f"{ns}_{name}_total {value}")
+
+        samples: Dict[str, List[str]] = {}
+        for cache, stats in sorted(self.collectors.items()):
+            for key, value in stats().items():
+                name = f"{ns}_cache_{key}"
+                if key in _COUNTER_KEYS:
+                    name += "_total"
+                samples.setdefault(name, []).append(
+                    f'{name}{{cache="{cache}"}} {value}'
+                )
+
+        for name, values in samples.items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines += values
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop recorded phases and counters, cache stats are kept."""
+
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+metrics = Metrics()
+
+
+def timed(name: str, function: Callable) -> Callable:
+    """`function` wrapped to run as phase `name`."""
+
+    def wrapper(*args, **kwargs):
+        with metrics.phase(name):
+            return function(*args, **kwargs)
+
+    return wrapper
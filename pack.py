@@ -0,0 +1,149 @@
+import json
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from asset_io import atomic_write
+
+PACK_PATH = "attributes/static_assets.pack"
+STATIC_ASSET_DIRS = ("attributes/UI", "attributes/Assets")
+
+PACK_MAGIC = b"ENKAPACK"
+PACK_VERSION = 1
+# Magic, version and index length
+_HEADER = struct.Struct("<8sIQ")
+# Pixel data offsets are aligned to this many bytes
+PACK_ALIGNMENT = 64
+
+# (data offset, width, height, source size, source mtime_ns)
+Entry = Tuple[int, int, int, int, int]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // PACK_ALIGNMENT) * PACK_ALIGNMENT
+
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    """(size, mtime_ns) of a source file, to tell when it changed."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def static_asset_paths(directories: Iterable[str] = STATIC_ASSET_DIRS) -> list:
+    paths = []
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                if file.lower().endswith(".png"):
+                    paths.append(os.path.join(root, file).replace(os.sep, "/"))
+
+    return paths
+
+
+def build_pack(
+    directories: Iterable[str] = STATIC_ASSET_DIRS, path: str = PACK_PATH
+) -> int:
+    """Decode every PNG under `directories` to raw RGBA and write them
+    into a single pack file with an index, returns the number of
+    images packed. Build it again whenever the assets change; entries
+    whose source file changed since are ignored at runtime."""
+
+    images = {}
+    for asset_path in static_asset_paths(directories):
+        images[asset_path] = Image.open(asset_path).convert("RGBA")
+
+    # Offsets are relative to the start of the pixel data, which
+    # follows the index
+    entries: Dict[str, Entry] = {}
+    offset = 0
+    for asset_path, im in images.items():
+        entries[asset_path] = (offset, im.width, im.height, *source_stamp(asset_path))
+        offset = _align(offset + im.width * im.height * 4)
+
+    index = json.dumps({"assets": entries}, separators=(",", ":")).encode()
+    data_start = _align(_HEADER.size + len(index))
+
+    def write(f: BinaryIO) -> None:
+        f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index)))
+        f.write(index)
+        for asset_path, im in images.items():
+            f.seek(data_start + entries[asset_path][0])
+            f.write(im.tobytes())
+
+    atomic_write(path, write)
+
+    return len(entries)
+
+
+class AssetPack:
+    """Static assets pre-decoded to raw RGBA, mapped into memory.
+
+    Images are read-only views straight onto the mapping, so nothing
+    is decoded at startup and every worker process shares the same
+    physical pages through the OS page cache. Pillow copies a view
+    before anything draws onto it.
+    """
+
+    def __init__(self, path: str = PACK_PATH) -> None:
+        self.path = path
+        self.entries: Dict[str, Entry] = {}
+        self._map: Optional[mmap.mmap] = None
+
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Missing or empty pack, every lookup misses
+            return
+
+        magic, version, index_length = _HEADER.unpack_from(self._map)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            return
+
+        index = json.loads(self._map[_HEADER.size : _HEADER.size + index_length])
+        self._data_start = _align(_HEADER.size + index_length)
+        for asset_path, entry in index["assets"].items():
+            # Skip assets edited since the pack was built
+            try:
+                if source_stamp(asset_path) == tuple(entry[3:]):
+                    self.entries[asset_path] = tuple(entry)
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._map) if self._map is not None else 0
+
+    def get(self, path: str) -> Optional[Image.Image]:
+        """Read-only RGBA view of `path`, None when it is not packed."""
+
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+
+        offset, width, height = entry[:3]
+        offset += self._data_start
+        data = memoryview(self._map)[offset : offset + width * height * 4]
+        return Image.frombuffer("RGBA", (width, height), data, "raw", "RGBA", 0, 1)
+
+
+@lru_cache(maxsize=None)
+def get_asset_pack() -> AssetPack:
+    """Process-wide asset pack, mapped on first use. Forked workers
+    inherit the mapping."""
+    return AssetPack()
+
+
+if __name__ == "__main__":
+    count = build_pack()
+    print(f"Packed {count} static assets into {PACK_PATH}")
@@ -1,3 +1,11 @@
+# Rows every card shows, ahead of the RELIQUARY_STATS it has
+BASE_STATS = [
+    "FIGHT_PROP_HP",
+    "FIGHT_PROP_ATTACK",
+    "FIGHT_PROP_DEFENSE",
+    "FIGHT_PROP_ELEMENT_MASTERY",
+]
+
 RELIQUARY_STATS = [
     "FIGHT_PROP_CRITICAL",
     "FIGHT_PROP_CRITICAL_HURT",
@@ -15,6 +23,12 @@ RELIQUARY_STATS = [
     "FIGHT_PROP_PHYSICAL_ADD_HURT",
 ]
 
+# Dropped first when a card has more stats than rows
+DROPPABLE_STATS = [
+    "FIGHT_PROP_HEAL_ADD",
+    "FIGHT_PROP_SHIELD_COST_MINUS_RATIO",
+]
+
 RARITY_REFERENCE = {
     "1": "ONE_STAR",
     "2": "TWO_STAR",
@@ -46,3 +60,15 @@ SUBST_ORDER = [
     "FIGHT_PROP_ELEMENT_MASTERY",
     "FIGHT_PROP_CHARGE_EFFICIENCY",
 ]
+
+BACKGROUND_REFERENCE = {
+    "Pyro": (186, 140, 131),
+    "Hydro": (132, 161, 198),
+    "Dendro": (45, 142, 52),
+    "Electro": (152, 118, 173),
+    "Anemo": (82, 176, 177),
+    "Cryo": (70, 168, 186),
+    "Geo": (187, 159, 75),
+}
+
+DEFAULT_BACKGROUND = (255, 255, 255, 50)
@@ -0,0 +1,50 @@
+from typing import Tuple
+
+from PIL import Image
+
+from cache import LRUCache
+
+# Largest per-channel difference between a precomposited paste
+# and the stacked pastes it replaces (8-bit rounding per pass)
+STACKED_SPRITE_TOLERANCE = 3
+
+_stacked_masks = LRUCache(max_items=512)
+
+
+def stacked_mask(im: Image.Image, times: int) -> Image.Image:
+    """Paste mask equivalent to pasting `im` onto itself `times` times.
+
+    Every paste blends out = src * a + dst * (1 - a), so after n passes
+    the destination keeps (1 - a) ** n of itself. Pasting the sprite
+    once through a mask of 1 - (1 - a) ** n gives the same result.
+    """
+
+    # Images are keyed on identity, the cached image keeps its id alive
+    key = (id(im), times)
+    entry = _stacked_masks.get(key)
+    if entry is not None and entry[0] is im:
+        return entry[1]
+
+    lut = [round(255 * (1 - (1 - a / 255) ** times)) for a in range(256)]
+    mask = im.getchannel("A").point(lut)
+    _stacked_masks.put(key, (im, mask))
+
+    return mask
+
+
+def paste_stacked(
+    dest: Image.Image,
+    im: Image.Image,
+    xy: Tuple[int, int],
+    times: int,
+    precomposite: bool = True,
+) -> None:
+    """Paste `im` onto `dest` as if it was pasted `times` times over
+    itself, in a single pass unless `precomposite` is off."""
+
+    if precomposite and times > 1:
+        dest.paste(im, xy, stacked_mask(im, times))
+        return
+
+    for _ in range(times):
+        dest.paste(im, xy, im)
@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+from pydantic import BaseModel
+
+from asset_io import AssetLock, atomic_write, write_asset
+
+GENSHIN_ASSET_DIR = "attributes/Genshin"
+MANIFEST_NAME = "manifest.json"
+
+
+class AssetRecord(BaseModel):
+    sha256: str
+    size: int
+    width: int
+    height: int
+    url: str = ""
+
+
+class AssetStore:
+    """Index of the downloaded game assets under `root`.
+
+    Files keep their by-name layout (Gacha/, UI/, Weapon/, Artifact/)
+    and the manifest maps each relative path to its content hash, size,
+    dimensions and source URL. The manifest is loaded once into memory,
+    so checking for an asset does not touch the filesystem.
+    """
+
+    def __init__(
+        self, root: str = GENSHIN_ASSET_DIR, manifest_path: Optional[str] = None
+    ) -> None:
+        self.root = root
+        self.manifest_path = manifest_path or os.path.join(root, MANIFEST_NAME)
+        self.index: Dict[str, AssetRecord] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def key(self, path: str) -> Optional[str]:
+        """Manifest key of `path`, None when it lies outside the store."""
+
+        key = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return None if key.startswith("../") else key
+
+    def __contains__(self, path: str) -> bool:
+        key = self.key(path)
+        return key is not None and key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, path: str) -> Optional[AssetRecord]:
+        return self.index.get(self.key(path))
+
+    def exists(self, path: str) -> bool:
+        return path in self or os.path.exists(path)
+
+    def load(self) -> "AssetStore":
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                entries = json.load(f)
+
+            with self._lock:
+                for key, entry in entries.items():
+                    self.index.setdefault(key, AssetRecord(**entry))
+
+        return self
+
+    def add(self, path: str, content: bytes, url: str = "") -> AssetRecord:
+        with Image.open(io.BytesIO(content)) as im:
+            width, height = im.size
+
+        record = AssetRecord(
+            sha256=hashlib.sha256(content).hexdigest(),
+            size=len(content),
+            width=width,
+            height=height,
+            url=url,
+        )
+
+        key = self.key(path)
+        if key is not None:
+            with self._lock:
+                self.index[key] = record
+                self._dirty = True
+
+        return record
+
+    def discard(self, path: str) -> None:
+        """Drop `path` from the manifest and delete its file,
+        so that it is downloaded again."""
+
+        key = self.key(path)
+        if key is not None:
+            with self._lock:
+                if self.index.pop(key, None) is not None:
+                    self._dirty = True
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def write(self, path: str, content: bytes, url: str = "") -> AssetRecord:
+        """Validate and atomically write a downloaded asset, then index it."""
+
+        write_asset(path, content)
+        return self.add(path, content, url)
+
+    def save(self) -> None:
+        """Write the manifest, merged with entries other
+        processes saved since it was loaded."""
+
+        if not self._dirty:
+            return
+
+        with AssetLock(self.manifest_path):
+            self.load()
+
+            with self._lock:
+                entries = {k: v.dict() for k, v in sorted(self.index.items())}
+                self._dirty = False
+
+            atomic_write(self.manifest_path, json.dumps(entries, indent=2).encode())
+
+    def scan(self) -> int:
+        """Index asset files already on disk but missing from the
+        manifest, returns how many were added."""
+
+        added = 0
+        for directory, _, files in os.walk(self.root):
+            for file in files:
+                path = os.path.join(directory, file)
+                if not file.lower().endswith(".png") or path in self:
+                    continue
+
+                with open(path, "rb") as f:
+                    self.add(path, f.read())
+                added += 1
+
+        return added
+
+    def verify(self) -> List[str]:
+        """Manifest entries whose file is missing or has changed."""
+
+        broken = []
+        for key, record in self.index.items():
+            path = os.path.join(self.root, key)
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                digest = None
+
+            if digest != record.sha256:
+                broken.append(key)
+
+        return broken
+
+    def repair(self) -> List[str]:
+        """Discard the entries verify reports, returns their keys."""
+
+        broken = self.verify()
+        for key in broken:
+            self.discard(os.path.join(self.root, key))
+
+        return broken
+
+
+asset_store = AssetStore()
+
+
+def referenced_assets() -> List[Tuple[str, str]]:
+    """(path, url) of every banner, constellation and skill icon
+    referenced by the enkanetwork Assets data. Weapon and artifact
+    icons are not listed there; sync them per profile with --uid."""
+
+    from enkanetwork import Assets
+
+    from utils import genshin_asset_path
+
+    assets = Assets()
+    refs = []
+
+    for character_id in assets.CHARACTERS_IDS:
+        character = Assets.character(character_id)
+        if not character:
+            continue
+
+        banner = character.images.banner
+        refs.append((genshin_asset_path("Gacha", banner.filename), banner.url))
+
+        for constellation_id in character.constellations:
+            constellation = Assets.constellations(constellation_id)
+            if constellation:
+                icon = constellation.icon
+                refs.append((genshin_asset_path("UI", icon.filename), icon.url))
+
+        for skill_id in character.skills:
+            skill = Assets.skills(skill_id)
+            if skill:
+                icon = skill.icon
+                refs.append((genshin_asset_path("UI", icon.filename), icon.url))
+
+    for costume_id in assets.COSTUMES_IDS:
+        costume = Assets.character_costume(costume_id)
+        if costume:
+            banner = costume.images.banner
+            refs.append((genshin_asset_path("Gacha", banner.filename), banner.url))
+
+    return refs
+
+
+async def sync(uids: Iterable[int] = (), concurrency: int = 16) -> None:
+    from enkanetwork import EnkaNetworkAPI
+
+    from fetcher import AssetFetcher, character_assets
+
+    refs = referenced_assets()
+
+    if uids:
+        async with EnkaNetworkAPI() as client:
+            for uid in uids:
+                data = await client.fetch_user(uid)
+                for character in data.characters or []:
+                    refs.extend(character_assets(character))
+
+    # Deleted or corrupted files are downloaded again
+    repaired = asset_store.repair()
+    if repaired:
+        print(f"{len(repaired)} indexed assets missing or changed on disk")
+
+    missing = {path: url for path, url in refs if path not in asset_store}
+    print(f"{len(missing)} of {len(dict(refs))} referenced assets to download")
+
+    async with AssetFetcher(concurrency=concurrency) as fetcher:
+        results = await fetcher.fetch_all(missing.items(), return_exceptions=True)
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    for error in failed:
+        print(f"  {error}")
+
+    print(f"Downloaded {fetcher.downloads}, {len(failed)} failed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the local asset store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser(
+        "sync", help="download every referenced asset into the store"
+    )
+    sync_parser.add_argument("--uid", type=int, nargs="*", default=[])
+    sync_parser.add_argument("--concurrency", type=int, default=16)
+    commands.add_parser("scan", help="index asset files already on disk")
+    verify_parser = commands.add_parser(
+        "verify", help="check files against the manifest"
+    )
+    verify_parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="drop missing or changed files, to be downloaded again",
+    )
+
+    args = parser.parse_args()
+    asset_store.load()
+
+    if args.command == "sync":
+        asyncio.run(sync(args.uid, args.concurrency))
+    elif args.command == "scan":
+        print(f"Indexed {asset_store.scan()} new assets")
+    elif args.command == "verify":
+        total = len(asset_store)
+        broken = asset_store.repair() if args.repair else asset_store.verify()
+        for key in broken:
+            print(f"  {key}")
+        print(f"{total - len(broken)} ok, {len(broken)} missing or changed")
+        if args.repair and broken:
+            print("Dropped them from the manifest, they download again when used")
+
+    asset_store.save()
+
+
+if __name__ == "__main__":
+    main()
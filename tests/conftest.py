@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    # Static assets are opened by paths relative to the repository
+    monkeypatch.chdir(ROOT)
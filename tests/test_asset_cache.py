@@ -0,0 +1,60 @@
+"""scale_image, brighten and fade_asset_icon only reuse cached results
+for the very images the asset cache handed out, not for images derived
+from them."""
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+import utils
+
+
+@pytest.fixture
+def asset(tmp_path):
+    path = str(tmp_path / "icon.png")
+    im = Image.new("RGBA", (40, 40), (0, 0, 0, 0))
+    ImageDraw.Draw(im).ellipse((4, 4, 36, 36), fill=(200, 120, 40, 255))
+    im.save(path)
+
+    return utils.open_image(path)
+
+
+def test_cached_asset_results_are_reused(asset):
+    assert utils.scale_image(asset, fixed_height=20) is utils.scale_image(
+        asset, fixed_height=20
+    )
+    assert utils.brighten(asset, 0.5) is utils.brighten(asset, 0.5)
+
+
+def test_crop_is_not_scaled_from_cache(asset):
+    utils.scale_image(asset, fixed_height=20)
+    crop = asset.crop((0, 0, 20, 40))
+
+    assert utils.scale_image(crop, fixed_height=20).size == (10, 20)
+
+
+def test_drawn_copy_is_not_brightened_from_cache(asset):
+    pristine = utils.brighten(asset, 0.5)
+    drawn = asset.copy()
+    ImageDraw.Draw(drawn).rectangle((0, 0, 39, 39), fill=(255, 255, 255, 255))
+
+    assert utils.brighten(drawn, 0.5).getpixel((0, 0)) != pristine.getpixel((0, 0))
+
+
+def test_derived_images_carry_no_cache_key(asset):
+    for im in (asset, utils.scale_image(asset, fixed_percent=50), asset.copy()):
+        assert "asset_key" not in im.info
+
+
+def test_faded_icon_is_cached(asset):
+    faded = utils.fade_asset_icon(asset, "artifact")
+
+    assert utils.fade_asset_icon(asset, "artifact") is faded
+    assert utils.fade_asset_icon(asset.copy(), "artifact") is not faded
+
+
+def test_faded_icon_matches_fallback(asset):
+    faded = utils.fade_asset_icon(asset, "artifact")
+    fallback = utils.fade_asset_icon(asset, "artifact", cache=False)
+
+    difference = ImageChops.difference(faded, fallback)
+    assert difference.getbbox(alpha_only=False) is None
@@ -0,0 +1,141 @@
+"""AssetFetcher against a local HTTP server: retries, failures,
+validation, timeouts and deduplicated downloads."""
+
+import asyncio
+import io
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from asset_io import AssetDownloadError, InvalidAssetError
+from fetcher import AssetFetcher
+from store import asset_store
+
+
+def png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGBA", (16, 16), (200, 120, 40, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.requests = Counter()
+        # path: list of (status, body, delay) answered in turn, the
+        # last one repeating
+        self.responses = {}
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.server.requests[self.path] += 1
+        responses = self.server.responses.get(self.path, [(404, b"", 0)])
+        count = self.server.requests[self.path]
+        status, body, delay = responses[min(count, len(responses)) - 1]
+
+        time.sleep(delay)
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs=dict(poll_interval=0.05), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def asset_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(asset_store, "root", str(tmp_path))
+    monkeypatch.setattr(asset_store, "manifest_path", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(asset_store, "index", {})
+    return tmp_path
+
+
+def fetch(*assets, **options):
+    async def run():
+        async with AssetFetcher(backoff=0.01, **options) as fetcher:
+            return await fetcher.fetch_all(assets)
+
+    return asyncio.run(run())
+
+
+def test_retries_on_503(server, asset_dir):
+    server.responses["/flaky.png"] = [(503, b"", 0), (503, b"", 0), (200, png(), 0)]
+    path = str(asset_dir / "flaky.png")
+
+    fetch((path, server.url("/flaky.png")))
+
+    assert server.requests["/flaky.png"] == 3
+    with open(path, "rb") as f:
+        assert f.read() == png()
+
+
+def test_fails_fast_on_404(server, asset_dir):
+    path = str(asset_dir / "missing.png")
+
+    with pytest.raises(AssetDownloadError):
+        fetch((path, server.url("/missing.png")))
+
+    assert server.requests["/missing.png"] == 1
+    assert not os.path.exists(path)
+
+
+def test_rejects_truncated_png(server, asset_dir):
+    content = png()
+    server.responses["/truncated.png"] = [(200, content[: len(content) // 2], 0)]
+    path = str(asset_dir / "truncated.png")
+
+    with pytest.raises(InvalidAssetError):
+        fetch((path, server.url("/truncated.png")))
+
+    assert os.listdir(asset_dir) == []
+
+
+def test_times_out(server, asset_dir):
+    server.responses["/slow.png"] = [(200, png(), 1)]
+    path = str(asset_dir / "slow.png")
+
+    start = time.perf_counter()
+    with pytest.raises(AssetDownloadError):
+        fetch((path, server.url("/slow.png")), timeout=0.1, retries=1)
+
+    assert time.perf_counter() - start < 1
+    assert server.requests["/slow.png"] == 2
+    assert not os.path.exists(path)
+
+
+def test_concurrent_fetches_share_one_request(server, asset_dir):
+    server.responses["/shared.png"] = [(200, png(), 0.2)]
+    path = str(asset_dir / "shared.png")
+    url = server.url("/shared.png")
+
+    async def run():
+        async with AssetFetcher() as fetcher:
+            return await asyncio.gather(*(fetcher.fetch(path, url) for _ in range(5)))
+
+    assert asyncio.run(run()) == [path] * 5
+    assert server.requests["/shared.png"] == 1
+    assert path in asset_store
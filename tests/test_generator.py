@@ -0,0 +1,62 @@
+"""render_card and encode_card look up and store cards under the same
+card_cache keys."""
+
+import asyncio
+
+import pytest
+from enkanetwork import Language
+
+import generator
+import utils
+from benchmarks.fixtures import make_assets, profile
+from cache import BlobCache
+from card import CardData
+from store import asset_store
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator, "card_cache", BlobCache())
+    monkeypatch.setattr(utils, "GENSHIN_ASSET_DIR", str(tmp_path))
+    monkeypatch.setattr(asset_store, "root", str(tmp_path))
+    monkeypatch.setattr(asset_store, "manifest_path", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(asset_store, "index", {})
+
+    data = profile("Hydro")
+    make_assets(data)
+    return data
+
+
+def key(data, stacked_sprites: bool) -> str:
+    card = CardData.from_api(data, data.characters[0])
+    return generator.card_cache_key(
+        card,
+        Language.EN,
+        "png",
+        generator.DEFAULT_COMPRESS_LEVEL,
+        generator.DEFAULT_QUALITY,
+        stacked_sprites,
+        {},
+    )
+
+
+@pytest.mark.parametrize("stacked_sprites", [True, False])
+def test_render_card_stores_under_encode_card_key(data, stacked_sprites):
+    content = asyncio.run(
+        generator.render_card(data, data.characters[0], stacked_sprites=stacked_sprites)
+    )
+
+    assert generator.card_cache.get(key(data, stacked_sprites)) is content
+    assert generator.card_cache.get(key(data, not stacked_sprites)) is None
+
+
+@pytest.mark.parametrize("stacked_sprites", [True, False])
+def test_render_card_serves_encode_card_entry(data, stacked_sprites):
+    card = CardData.from_api(data, data.characters[0])
+    content = generator.encode_card(card, stacked_sprites=stacked_sprites)
+
+    served = asyncio.run(
+        generator.render_card(data, data.characters[0], stacked_sprites=stacked_sprites)
+    )
+
+    assert served is content
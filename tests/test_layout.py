@@ -0,0 +1,59 @@
+"""The layout engine draws every fixture case exactly as the original
+generate_image did.
+
+tests/layout_digests.json holds the digest of every case as drawn by
+generate_image before any of the rendering changes, made with
+`python -m benchmarks.layout digests`. Precomposited sprites (the
+stacked_sprites default) round differently, so they are compared with
+the exact path, within STACKED_SPRITE_TOLERANCE.
+"""
+
+import json
+import os
+
+import pytest
+from PIL import ImageChops
+
+from benchmarks.fixtures import CASES, case_profiles
+from benchmarks.layout import card_digest
+from generator import render_image
+from sprites import STACKED_SPRITE_TOLERANCE
+
+with open(os.path.join(os.path.dirname(__file__), "layout_digests.json")) as f:
+    DIGESTS = json.load(f)
+
+
+@pytest.fixture(scope="module")
+def profiles(tmp_path_factory):
+    # Placeholder assets are drawn in case order, as for the digests
+    return dict(case_profiles(str(tmp_path_factory.mktemp("assets"))))
+
+
+def render(data, stacked_sprites: bool):
+    return render_image(
+        data, data.characters[0], cache=False, stacked_sprites=stacked_sprites
+    )
+
+
+def test_every_case_has_a_digest():
+    assert set(DIGESTS["cases"]) == set(CASES)
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_card_matches_original(profiles, name):
+    assert name in DIGESTS["cases"], f"no reference digest for {name}"
+
+    card = render(profiles[name], stacked_sprites=False)
+    assert card_digest(card) == DIGESTS["cases"][name], (
+        f"{name} differs from the original card "
+        f"(digests made with Pillow {DIGESTS['pillow']})"
+    )
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_stacked_sprites_round_alike(profiles, name):
+    exact = render(profiles[name], stacked_sprites=False)
+    stacked = render(profiles[name], stacked_sprites=True)
+
+    difference = ImageChops.difference(exact, stacked)
+    assert max(high for _, high in difference.getextrema()) <= STACKED_SPRITE_TOLERANCE
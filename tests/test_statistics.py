@@ -0,0 +1,130 @@
+"""Which stat rows a card shows, in which order, and their values.
+
+The expected rows are those the format_statistics that predates
+statistic_rows picked for the same stats.
+"""
+
+import pytest
+
+from benchmarks.stats import COMMON_PROPS, character
+from utils import MAX_STAT_ROWS, StatRow, format_statistics, statistic_rows
+
+FIRST_ROWS = [
+    "HP",
+    "ATTACK",
+    "DEFENSE",
+    "ELEMENT_MASTERY",
+    "CRITICAL",
+    "CRITICAL_HURT",
+    "CHARGE_EFFICIENCY",
+]
+
+# name: (element, extra fightPropMap entries, rows without FIGHT_PROP_)
+CASES = {
+    "base-only": ("Pyro", {}, ["HP", "ATTACK", "DEFENSE"]),
+    "eight-rows": (
+        "Pyro",
+        {**COMMON_PROPS, "40": 0.466},
+        FIRST_ROWS + ["FIRE_ADD_HURT"],
+    ),
+    # Every bonus is kept while there is room
+    "bonuses-fit": (
+        "Pyro",
+        {"20": 0.5, "40": 0.466, "42": 0.2},
+        ["HP", "ATTACK", "DEFENSE", "CRITICAL", "FIRE_ADD_HURT", "WATER_ADD_HURT"],
+    ),
+    "eight-with-healing": (
+        "Hydro",
+        {**COMMON_PROPS, "26": 0.35},
+        FIRST_ROWS[:-1] + ["HEAL_ADD", "CHARGE_EFFICIENCY"],
+    ),
+    # Healing and shield strength go first when there is no room
+    "healing-and-shield-dropped": (
+        "Pyro",
+        {**COMMON_PROPS, "26": 0.35, "81": 0.2, "40": 0.466},
+        FIRST_ROWS + ["FIRE_ADD_HURT"],
+    ),
+    # Dropping them makes room, but only the highest bonus is kept
+    "dropped-then-highest-bonus": (
+        "Pyro",
+        {
+            **{"20": 0.5, "22": 1.0, "23": 1.2, "26": 0.2, "81": 0.3},
+            **{"40": 0.466, "42": 0.2, "44": 0.1},
+        },
+        ["HP", "ATTACK", "DEFENSE"] + FIRST_ROWS[4:] + ["FIRE_ADD_HURT"],
+    ),
+    "highest-bonus-kept": (
+        "Anemo",
+        {**COMMON_PROPS, "44": 0.466, "40": 0.1, "30": 0.2},
+        FIRST_ROWS + ["WIND_ADD_HURT"],
+    ),
+    # The character's own element counts for nothing unless tied
+    "own-bonus-lower": (
+        "Dendro",
+        {**COMMON_PROPS, "40": 0.616, "43": 0.466},
+        FIRST_ROWS + ["FIRE_ADD_HURT"],
+    ),
+    "overflowing": (
+        "Dendro",
+        {**COMMON_PROPS, "26": 0.2, "81": 0.3, "40": 0.1, "43": 0.616, "30": 0.3},
+        FIRST_ROWS + ["GRASS_ADD_HURT"],
+    ),
+    # Equal damage bonuses: the character's own element is kept
+    "equal-bonuses": (
+        "Hydro",
+        {**COMMON_PROPS, "40": 0.466, "42": 0.466, "30": 0.466},
+        FIRST_ROWS + ["WATER_ADD_HURT"],
+    ),
+    # Electro ("Electric") matches no ELEC prop, the first bonus is kept
+    "equal-bonuses-electro": (
+        "Electro",
+        {**COMMON_PROPS, "41": 0.466, "40": 0.466},
+        FIRST_ROWS + ["FIRE_ADD_HURT"],
+    ),
+    # Every bonus tied for the highest is kept, even past eight rows
+    "tied-highest-kept": (
+        "Geo",
+        {**COMMON_PROPS, "45": 0.466, "46": 0.466, "40": 0.1},
+        FIRST_ROWS + ["ICE_ADD_HURT", "ROCK_ADD_HURT"],
+    ),
+    # Bonuses are compared as displayed, both are 46.6%
+    "rounded-tie": (
+        "Cryo",
+        {**COMMON_PROPS, "46": 0.4664, "40": 0.46649},
+        FIRST_ROWS + ["ICE_ADD_HURT"],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_selected_rows(name):
+    element, props, expected = CASES[name]
+    rows = statistic_rows(character(element, props))
+
+    assert [row.prop_id.replace("FIGHT_PROP_", "") for row in rows] == expected
+
+
+def test_row_values():
+    element, props, _ = CASES["eight-rows"]
+
+    assert statistic_rows(character(element, props)) == (
+        StatRow("FIGHT_PROP_HP", 34001, "34,001", "15,552", "18,448"),
+        StatRow("FIGHT_PROP_ATTACK", 1400, "1,400", "716", "685"),
+        StatRow("FIGHT_PROP_DEFENSE", 1000, "1,000", "876", "124"),
+        StatRow("FIGHT_PROP_ELEMENT_MASTERY", 120, "120"),
+        StatRow("FIGHT_PROP_CRITICAL", 70.0, "70.0%"),
+        StatRow("FIGHT_PROP_CRITICAL_HURT", 210.0, "210.0%"),
+        StatRow("FIGHT_PROP_CHARGE_EFFICIENCY", 110.0, "110.0%"),
+        StatRow("FIGHT_PROP_FIRE_ADD_HURT", 46.6, "46.6%"),
+    )
+
+
+def test_format_statistics():
+    element, props, _ = CASES["tied-highest-kept"]
+    statistics = format_statistics(character(element, props))
+
+    assert len(statistics) == MAX_STAT_ROWS + 1
+    assert statistics["FIGHT_PROP_HP"] == "34,001 (15,552 + 18,448)"
+    assert statistics["FIGHT_PROP_CRITICAL"] == "70.0%"
+    assert statistics["FIGHT_PROP_ICE_ADD_HURT"] == "46.6%"
+    assert statistics["FIGHT_PROP_ROCK_ADD_HURT"] == "46.6%"
@@ -0,0 +1,86 @@
+"""AssetStore manifest checks, and open_image recovering from indexed
+files that were deleted or corrupted."""
+
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+import utils
+from store import asset_store
+
+URL = "https://example.invalid/icon.png"
+
+
+def png(color=(200, 120, 40, 255)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGBA", (16, 16), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def asset_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(asset_store, "root", str(tmp_path))
+    monkeypatch.setattr(asset_store, "manifest_path", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(asset_store, "index", {})
+    return tmp_path
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """URLs requested through check_asset, answered with a PNG."""
+
+    urls = []
+
+    def get(url, timeout):
+        urls.append(url)
+        return SimpleNamespace(content=png(), raise_for_status=lambda: None)
+
+    monkeypatch.setattr(utils.requests, "get", get)
+    return urls
+
+
+def test_verify_and_repair(asset_dir):
+    paths = [str(asset_dir / f"{name}.png") for name in ("ok", "gone", "changed")]
+    for path in paths:
+        asset_store.write(path, png(), URL)
+
+    os.remove(paths[1])
+    with open(paths[2], "wb") as f:
+        f.write(png((0, 0, 0, 255)))
+
+    assert asset_store.verify() == ["gone.png", "changed.png"]
+    assert asset_store.repair() == ["gone.png", "changed.png"]
+    assert paths[0] in asset_store
+    assert paths[2] not in asset_store and not os.path.exists(paths[2])
+    assert asset_store.verify() == []
+
+
+@pytest.mark.parametrize("damage", ["delete", "truncate"])
+def test_open_image_downloads_damaged_asset(asset_dir, downloads, damage):
+    path = str(asset_dir / "icon.png")
+    asset_store.write(path, png(), URL)
+
+    if damage == "delete":
+        os.remove(path)
+    else:
+        with open(path, "r+b") as f:
+            f.truncate(40)
+
+    image = utils.open_image(path, URL, cache=False)
+
+    assert image.size == (16, 16)
+    assert downloads == [URL]
+    assert asset_store.verify() == []
+
+
+def test_open_image_without_url_raises(asset_dir, downloads):
+    path = str(asset_dir / "icon.png")
+    asset_store.write(path, png(), URL)
+    os.remove(path)
+
+    with pytest.raises(FileNotFoundError):
+        utils.open_image(path, cache=False)
+    assert downloads == []
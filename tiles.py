@@ -0,0 +1,127 @@
+from itertools import combinations
+from typing import Callable, Hashable, List, NamedTuple, Tuple
+
+from PIL import Image
+
+from cache import LRUCache, image_nbytes
+from metrics import metrics, timed
+
+# Composited card regions, about one card's worth of pixels per
+# character plus its base layer
+TILE_CACHE_BYTES = 128 * 1024 * 1024
+
+tile_cache = LRUCache(max_bytes=TILE_CACHE_BYTES, sizeof=image_nbytes)
+metrics.register_collector("tile", tile_cache.stats)
+
+
+class Region(NamedTuple):
+    name: str
+    # (left, top, right, bottom) on the card
+    box: Tuple[int, int, int, int]
+    # Everything the region draws depends on, besides the base layers
+    key: Hashable
+    # Draws the region onto (foreground, textground, origin), layers
+    # whose top left corner is at `origin` on the card
+    draw: Callable[[Image.Image, Image.Image, Tuple[int, int]], None]
+
+
+def _overlaps(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _merge(a: Region, b: Region) -> Region:
+    def draw(
+        foreground: Image.Image, textground: Image.Image, origin: Tuple[int, int]
+    ) -> None:
+        a.draw(foreground, textground, origin)
+        b.draw(foreground, textground, origin)
+
+    box = (
+        min(a.box[0], b.box[0]),
+        min(a.box[1], b.box[1]),
+        max(a.box[2], b.box[2]),
+        max(a.box[3], b.box[3]),
+    )
+    return Region(f"{a.name}+{b.name}", box, (a.key, b.key), draw)
+
+
+def merge_overlapping(regions: List[Region]) -> List[Region]:
+    """Merge regions whose boxes overlap into a single region, until
+    no two boxes overlap. Merged regions keep the drawing order."""
+
+    regions = list(regions)
+    merged = True
+    while merged:
+        merged = False
+        for i, j in combinations(range(len(regions)), 2):
+            if _overlaps(regions[i].box, regions[j].box):
+                regions[i] = _merge(regions[i], regions[j])
+                del regions[j]
+                merged = True
+                break
+
+    return regions
+
+
+def compose_card(
+    base_key: Hashable,
+    background: Image.Image,
+    character_layer: Image.Image,
+    regions: List[Region],
+    cache: bool = True,
+) -> Image.Image:
+    """Put a card together from per-region tiles.
+
+    A tile holds the final pixels of its box: the background and the
+    character layer underneath, with the region's drawing composited
+    on top. Tiles are cached on `base_key` (whatever the two base
+    layers depend on) and the region key, so only regions whose data
+    changed are drawn again. Every region must stay inside its box;
+    regions whose boxes overlap are merged into one tile. That keeps
+    the result identical to drawing the whole card at once.
+
+    Regions draw onto layers covering just their box, so the card
+    itself is the only full-size image a render allocates.
+    """
+
+    if metrics.enabled:
+        # Timed per region, "artifacts-2" as artifacts, before merging
+        regions = [
+            region._replace(draw=timed(region.name.split("-")[0], region.draw))
+            for region in regions
+        ]
+    regions = merge_overlapping(regions)
+
+    with metrics.phase("composite"):
+        card = tile_cache.get_or_create(
+            ("base", base_key),
+            lambda: Image.alpha_composite(background, character_layer),
+        ).copy()
+
+    tiles = {}
+    missing = []
+    for region in regions:
+        key = (region.name, region.box, base_key, region.key)
+        tile = tile_cache.get(key) if cache else None
+        if tile is None:
+            missing.append((key, region))
+        else:
+            tiles[region.name] = tile
+
+    for key, region in missing:
+        box = region.box
+        foreground = character_layer.crop(box)
+        textground = Image.new("RGBA", foreground.size, (0, 0, 0, 0))
+        region.draw(foreground, textground, box[:2])
+
+        with metrics.phase("composite"):
+            tile = Image.alpha_composite(
+                background.crop(box), Image.alpha_composite(foreground, textground)
+            )
+        tiles[region.name] = tile_cache.put(key, tile) if cache else tile
+
+    with metrics.phase("composite"):
+        for region in regions:
+            card.paste(tiles[region.name], region.box[:2])
+
+    return card
@@ -1,16 +1,39 @@
 import os
+import weakref
 from collections import Counter
-from typing import List, Literal
+from functools import lru_cache
+from typing import (Dict, Iterable, List, Literal, NamedTuple, Optional, Tuple,
+                    Union)
 
 import requests
 from enkanetwork.enum import EquipmentsType
 from enkanetwork.model import Stats
 from enkanetwork.model.character import CharacterInfo
 from enkanetwork.model.equipments import EquipmentsType
-from PIL import Image, ImageChops, ImageFont, ImageOps
+from PIL import Image, ImageChops, ImageEnhance, ImageFont, ImageOps
 from pydantic import BaseModel
 
-from prop_reference import ELEMENT_REFERENCE, RELIQUARY_STATS
+from asset_io import AssetDownloadError, AssetLock
+from cache import LRUCache, image_nbytes
+from fonts import FontVariation, font_registry
+from metrics import metrics
+from pack import STATIC_ASSET_DIRS, get_asset_pack, static_asset_paths
+from prop_reference import (DROPPABLE_STATS, ELEMENT_REFERENCE,
+                            RELIQUARY_STATS)
+from store import GENSHIN_ASSET_DIR, asset_store
+
+# Decoded and transformed images shared across renders, see open_image
+ASSET_CACHE_BYTES = 256 * 1024 * 1024
+CHARACTER_MASK = "attributes/Assets/enka_character_mask.png"
+ASSET_TIMEOUT = 10
+# Stat rows the card has room for
+MAX_STAT_ROWS = 8
+
+asset_cache = LRUCache(max_bytes=ASSET_CACHE_BYTES, sizeof=image_nbytes)
+metrics.register_collector("asset", asset_cache.stats)
+# Cache key of each image handed out by the asset cache, by id(). Not in
+# im.info: Pillow copies info to crops, copies, conversions and the like
+_asset_keys: Dict[int, Tuple[weakref.ref, tuple]] = {}
 
 
 class ActiveSet(BaseModel):
@@ -18,6 +41,25 @@ class ActiveSet(BaseModel):
     count: int
 
 
+class StatRow(NamedTuple):
+    prop_id: str
+    # Compared when rows are dropped, as displayed: rounded, and in
+    # percent for percentages (46.6 for 46.6%)
+    value: Union[int, float]
+    # Value drawn on the card
+    text: str
+    # Base and bonus parts drawn under HP, ATK and DEF
+    base: Optional[str] = None
+    bonus: Optional[str] = None
+
+
+def genshin_asset_path(
+    folder: Literal["Gacha", "UI", "Weapon", "Artifact"], filename: str
+) -> str:
+    """Local path of a downloaded game asset."""
+    return f"{GENSHIN_ASSET_DIR}/{folder}/{filename}.png"
+
+
 def check_asset(path: str, asset_url: str) -> None:
     """Helper function to check if an asset
     exists given a path and reference to the
@@ -25,14 +67,26 @@ def check_asset(path: str, asset_url: str) -> None:
     the asset will be downloaded from the source.
     """
 
-    if not os.path.exists(path):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if asset_store.exists(path):
+        return
+
+    with AssetLock(path):
+        # Another thread or process may have downloaded it meanwhile
+        if os.path.exists(path):
+            return
 
         try:
-            with open(path, "wb") as f:
-                f.write(requests.get(asset_url).content)
-        except:
-            raise Exception("There was an error downloading the asset.")
+            with metrics.phase("download"):
+                response = requests.get(asset_url, timeout=ASSET_TIMEOUT)
+                response.raise_for_status()
+        except requests.RequestException as e:
+            metrics.count("asset_download_errors")
+            raise AssetDownloadError("There was an error downloading the asset.") from e
+
+        asset_store.write(path, response.content, asset_url)
+        metrics.count("asset_downloads")
+
+    asset_store.save()
 
 
 def open_image(
@@ -41,79 +95,230 @@ def open_image(
     mode: str = "RGBA",
     resize: tuple = None,
     resample: int = Image.BICUBIC,
+    cache: bool = True,
 ) -> Image:
-    if not os.path.exists(path):
+    """Open (and download, if missing) an image asset.
+
+    Decoded images are kept in the process-wide asset cache keyed on
+    (path, mode, resize, resample). Cached images are shared between
+    callers, so copy them before drawing onto them.
+    """
+
+    key = (path, mode, tuple(resize) if resize else None, resample)
+    if cache:
+        image = asset_cache.get(key)
+        if image is not None:
+            return image
+
+    if path not in asset_store and asset_url is not None:
         check_asset(path, asset_url)
 
-    image = Image.open(path)
-    image = image.convert(mode)
+    # Static assets come pre-decoded from the asset pack when built
+    image = get_asset_pack().get(path) if mode == "RGBA" else None
+    if image is None:
+        try:
+            image = _decode(path, mode)
+        except (OSError, SyntaxError):
+            # Indexed, but deleted or corrupted since: download it again
+            if asset_url is None or path not in asset_store:
+                raise
+
+            asset_store.discard(path)
+            check_asset(path, asset_url)
+            image = _decode(path, mode)
 
     if resize:
         image = image.resize(resize, resample)
 
+    if cache:
+        return _cache_image(key, image)
+
     return image
 
 
+def _decode(path: str, mode: str) -> Image:
+    with metrics.phase("decode"):
+        image = Image.open(path)
+        return image.convert(mode)
+
+
 def scale_image(
     im: Image,
     fixed_height: int = None,
     fixed_width: int = None,
     fixed_percent: int = None,
 ) -> Image:
+    key = _asset_key(im)
+    if key is not None:
+        key = key + (("scale", fixed_height, fixed_width, fixed_percent),)
+        scaled = asset_cache.get(key)
+        if scaled is not None:
+            return scaled
+
     if fixed_height:
         wpercent = fixed_height / float(im.size[1])
         wsize = int((float(im.size[0]) * float(wpercent)))
-        return im.resize((wsize, fixed_height), Image.BICUBIC)
+        scaled = im.resize((wsize, fixed_height), Image.BICUBIC)
     elif fixed_width:
         hpercent = fixed_width / float(im.size[0])
         hsize = int((float(im.size[1]) * float(hpercent)))
-        return im.resize((fixed_width, hsize), Image.BICUBIC)
+        scaled = im.resize((fixed_width, hsize), Image.BICUBIC)
     elif fixed_percent:
-        return im.resize(
+        scaled = im.resize(
             (
                 int(im.size[0] * (fixed_percent / 100)),
                 int(im.size[1] * (fixed_percent / 100)),
             ),
             Image.BICUBIC,
         )
+    else:
+        return None
 
+    if key is not None:
+        return _cache_image(key, scaled)
 
-def get_font(font: Literal["normal"], size: int) -> ImageFont.FreeTypeFont:
-    """Helper method to get a font."""
-    return {
-        "normal": ImageFont.truetype("attributes/Fonts/JA-JP.TTF", size),
-        # Insert other fonts you'd like to use here, if any
-    }.get(font, ImageFont.truetype("attributes/Fonts/JA-JP.TTF", size))
+    return scaled
+
+
+def brighten(im: Image, factor: float) -> Image:
+    """ImageEnhance.Brightness, cached when `im` came
+    from the asset cache."""
+
+    key = _asset_key(im)
+    if key is not None:
+        key = key + (("brightness", factor),)
+        enhanced = asset_cache.get(key)
+        if enhanced is not None:
+            return enhanced
+
+    enhanced = ImageEnhance.Brightness(im).enhance(factor)
+
+    if key is not None:
+        return _cache_image(key, enhanced)
+
+    return enhanced
+
+
+def _cache_image(key: tuple, image: Image) -> Image:
+    # Remember the key so scale_image/brighten can derive cache keys
+    # from the image, an id is only reused once its image is gone
+    image = asset_cache.put(key, image)
+    ident = id(image)
+
+    def forget(ref: weakref.ref) -> None:
+        if _asset_keys.get(ident, (None,))[0] is ref:
+            del _asset_keys[ident]
+
+    _asset_keys[ident] = (weakref.ref(image, forget), key)
+    return image
+
+
+def _asset_key(im: Image) -> Optional[tuple]:
+    """Asset cache key of `im`, None unless it came from the cache."""
+
+    entry = _asset_keys.get(id(im))
+    if entry is not None and entry[0]() is im:
+        return entry[1]
+
+    return None
+
+
+def preload_static_assets(
+    directories: Iterable[str] = STATIC_ASSET_DIRS, mode: str = "RGBA"
+) -> int:
+    """Decode every PNG under `directories` into the asset
+    cache, returns the number of images loaded."""
 
+    count = 0
+    for path in static_asset_paths(directories):
+        open_image(path, mode=mode)
+        count += 1
 
-def fade_character_art(im: Image) -> Image:
-    # Load mask from attributes
-    mask = Image.open("attributes/Assets/enka_character_mask.png").convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    return count
 
-    # Extract alpha channel from original image
-    alpha = im.split()[-1]
 
-    # Apply mask to alpha channel
-    new_alpha = ImageOps.invert(mask)
-    alpha = ImageChops.multiply(alpha, new_alpha)
+def get_font(
+    font: Literal["normal"], size: int, variation: FontVariation = None
+) -> ImageFont.FreeTypeFont:
+    """Helper method to get a font. Fonts are loaded
+    once per process through the shared font registry."""
+    return font_registry.get(font, size, variation)
 
-    # Composite modified alpha channel back onto original image
-    result = im.copy()
-    result.putalpha(alpha)
+
+def load_mask(path: str, size: Tuple[int, int], invert: bool = False) -> Image:
+    """Greyscale mask read from `path` and resized to `size`."""
+
+    mask = Image.open(path).convert("L")
+    mask = mask.resize(size, Image.NEAREST)
+
+    if invert:
+        mask = ImageOps.invert(mask)
+
+    return mask
+
+
+@lru_cache(maxsize=64)
+def get_mask(path: str, size: Tuple[int, int], invert: bool = False) -> Image:
+    """Greyscale mask resized to `size`, loaded once per
+    (path, size, invert) and shared between callers."""
+
+    return load_mask(path, size, invert)
+
+
+def fade_character_art(im: Image, in_place: bool = False, cache: bool = True) -> Image:
+    """Fade the character art out through the character mask.
+    With `in_place`, the alpha band of `im` is replaced directly
+    instead of on a copy. Without `cache`, the mask is read from
+    disk on every call, as it used to be."""
+
+    with metrics.phase("fade"):
+        # Inverted mask from attributes, already resized to the art
+        new_alpha = (get_mask if cache else load_mask)(
+            CHARACTER_MASK, im.size, invert=True
+        )
+
+        # Apply mask to the alpha channel of the original image
+        alpha = ImageChops.multiply(im.getchannel("A"), new_alpha)
+
+        # Put modified alpha channel back onto the image
+        result = im if in_place else im.copy()
+        result.putalpha(alpha)
 
     return result
 
 
-def fade_asset_icon(im: Image, _type: Literal["artifact"]) -> Image:
+def fade_asset_icon(im: Image, _type: Literal["artifact"], cache: bool = True) -> Image:
+    """Fade the icon out through the mask of `_type`, cached when
+    `im` came from the asset cache. Without `cache`, the mask is
+    read from disk and pasted through on every call, as it used
+    to be."""
+
     mask_fp = {
         "artifact": "attributes/Assets/artifact_mask.png",
         # Insert other masks you'd like to use here, if any
     }.get(_type)
 
-    mask = Image.open(mask_fp).convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    if not cache:
+        return _paste_through(im, load_mask(mask_fp, im.size))
+
+    key = _asset_key(im)
+    if key is not None:
+        key = key + (("fade", _type),)
+        faded = asset_cache.get(key)
+        if faded is not None:
+            return faded
+
+    with metrics.phase("fade"):
+        faded = _paste_through(im, get_mask(mask_fp, im.size))
+
+    if key is not None:
+        return _cache_image(key, faded)
 
+    return faded
+
+
+def _paste_through(im: Image, mask: Image) -> Image:
+    # Pasting blends every band, not just alpha, with the mask
     overlay = Image.new("RGBA", im.size, (0, 0, 0, 0))
     overlay.paste(im, (0, 0), mask)
 
@@ -138,83 +343,94 @@ def get_stat_filename(icon: str) -> str:
     return icon
 
 
-def format_statistics(char: CharacterInfo) -> dict[str, int]:
-    """Format statistics for card, returns a dictionary
-    of statistics ({name, value} pairs) with a
-    maximum of 8 statistics."""
+def _total_row(prop_id: str, total: Stats, base: Stats) -> StatRow:
+    return StatRow(
+        prop_id,
+        total.to_rounded(),
+        "{:,}".format(total.to_rounded()),
+        "{:,}".format(base.to_rounded()),
+        "{:,}".format(round(total.value - base.value)),
+    )
+
+
+def statistic_rows(char: CharacterInfo) -> Tuple[StatRow, ...]:
+    """Stat rows of the card, in drawing order, trimmed by
+    select_statistic_rows."""
 
     stats = char.stats
+    rows = [
+        _total_row("FIGHT_PROP_HP", stats.FIGHT_PROP_MAX_HP, stats.BASE_HP),
+        _total_row(
+            "FIGHT_PROP_ATTACK",
+            stats.FIGHT_PROP_CUR_ATTACK,
+            stats.FIGHT_PROP_BASE_ATTACK,
+        ),
+        _total_row(
+            "FIGHT_PROP_DEFENSE",
+            stats.FIGHT_PROP_CUR_DEFENSE,
+            stats.FIGHT_PROP_BASE_DEFENSE,
+        ),
+    ]
+
+    mastery = stats.FIGHT_PROP_ELEMENT_MASTERY
+    if mastery.value:
+        value = mastery.to_rounded()
+        rows.append(StatRow("FIGHT_PROP_ELEMENT_MASTERY", value, "{:,}".format(value)))
+
+    for prop_id in RELIQUARY_STATS:
+        stat = getattr(stats, prop_id)
+        if not stat.value:
+            continue
+
+        if isinstance(stat, Stats):
+            value = stat.to_rounded()
+            rows.append(StatRow(prop_id, value, f"{value}"))
+        else:
+            value = stat.to_percentage()
+            rows.append(StatRow(prop_id, value, f"{value}%"))
+
+    return select_statistic_rows(rows, char.element.value.upper())
+
+
+def select_statistic_rows(rows: List[StatRow], element: str) -> Tuple[StatRow, ...]:
+    """Trim `rows` to the MAX_STAT_ROWS the card has room for.
+
+    DROPPABLE_STATS go first. If damage bonuses still overflow, those
+    below the highest are dropped, which keeps every bonus tied for
+    the highest even past MAX_STAT_ROWS. When they are all equal, the
+    bonus whose prop contains `element` stays in place, the others
+    move last and the list is cut at MAX_STAT_ROWS.
+    """
 
-    max_hp = "{:,}".format(stats.FIGHT_PROP_MAX_HP.to_rounded())
-    base_hp = "{:,}".format(stats.BASE_HP.to_rounded())
-    bonus_hp = "{:,}".format(round(stats.FIGHT_PROP_MAX_HP.value - stats.BASE_HP.value))
+    if len(rows) > MAX_STAT_ROWS:
+        rows = [row for row in rows if row.prop_id not in DROPPABLE_STATS]
+    if len(rows) <= MAX_STAT_ROWS:
+        return tuple(rows)
 
-    max_atk = "{:,}".format(stats.FIGHT_PROP_CUR_ATTACK.to_rounded())
-    base_atk = "{:,}".format(stats.FIGHT_PROP_BASE_ATTACK.to_rounded())
-    bonus_atk = "{:,}".format(
-        round(stats.FIGHT_PROP_CUR_ATTACK.value - stats.FIGHT_PROP_BASE_ATTACK.value)
-    )
+    bonuses = [row.value for row in rows if "ADD_HURT" in row.prop_id]
+    highest = max(bonuses, default=None)
+    if min(bonuses, default=None) != highest:
+        return tuple(
+            row for row in rows if "ADD_HURT" not in row.prop_id or row.value == highest
+        )
 
-    max_def = "{:,}".format(stats.FIGHT_PROP_CUR_DEFENSE.to_rounded())
-    base_def = "{:,}".format(stats.FIGHT_PROP_BASE_DEFENSE.to_rounded())
-    bonus_def = "{:,}".format(
-        round(stats.FIGHT_PROP_CUR_DEFENSE.value - stats.FIGHT_PROP_BASE_DEFENSE.value)
-    )
+    kept, moved = [], []
+    for row in rows:
+        if "ADD_HURT" in row.prop_id and element not in row.prop_id:
+            moved.append(row)
+        else:
+            kept.append(row)
 
-    ret_stats = {
-        "FIGHT_PROP_HP": f"{max_hp} ({base_hp} + {bonus_hp})",
-        "FIGHT_PROP_ATTACK": f"{max_atk} ({base_atk} + {bonus_atk})",
-        "FIGHT_PROP_DEFENSE": f"{max_def} ({base_def} + {bonus_def})",
-    }
+    return tuple((kept + moved)[:MAX_STAT_ROWS])
 
-    if stats.FIGHT_PROP_ELEMENT_MASTERY.value:
-        ret_stats["FIGHT_PROP_ELEMENT_MASTERY"] = "{:,}".format(
-            stats.FIGHT_PROP_ELEMENT_MASTERY.to_rounded()
-        )
 
-    for x in RELIQUARY_STATS:
-        if getattr(stats, x).value:
-            value = getattr(stats, x)
-
-            ret_stats[x] = (
-                value.to_rounded()
-                if isinstance(value, Stats)
-                else value.to_percentage_symbol()
-            )
-
-    if len(ret_stats) > 8:
-        # Who cares about these statistics
-        ret_stats.pop("FIGHT_PROP_HEAL_ADD", None)
-        ret_stats.pop("FIGHT_PROP_SHIELD_COST_MINUS_RATIO", None)
-
-    while len(ret_stats) > 8:
-        # Handle damage bonuses if there are more than 8 statistics
-        bonuses = []
-        for item in ret_stats:
-            if "ADD_HURT" in item:
-                bonuses.append(float(ret_stats[item].replace("%", "")))
-
-        # If all bonuses are the same, return whatever comes first
-        if all(x == bonuses[0] for x in bonuses):
-            for item in ret_stats.copy():
-                if "ADD_HURT" in item and char.element.value.upper() not in item:
-                    ret_stats[item] = ret_stats.pop(item)
-
-            return {k: ret_stats[k] for k in list(ret_stats)[:8]}
-
-        # Remove the lowest bonus in statistics
-        for bonus in sorted(bonuses):
-            if bonus != sorted(bonuses)[-1]:
-                for item in ret_stats:
-                    if (
-                        "ADD_HURT" in item
-                        and float(ret_stats[item].replace("%", "")) == bonus
-                    ):
-                        ret_stats.pop(item)
-                        break
-            else:
-                break
-
-        break
-
-    return ret_stats
+def format_statistics(char: CharacterInfo) -> dict[str, str]:
+    """Format statistics for card, returns a dictionary
+    of statistics ({name, value} pairs), see statistic_rows."""
+
+    return {
+        row.prop_id: (
+            row.text if row.base is None else f"{row.text} ({row.base} + {row.bonus})"
+        )
+        for row in statistic_rows(char)
+    }